@@ -0,0 +1,82 @@
+"""EMG zaman düzlemi öznitelikleri: kayan pencerede tüm kanallar tek NumPy geçişinde"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+WINDOW_SIZE = 256  # 2048 Hz'de 125 ms
+WINDOW_STEP = 64  # Pencere kaydırma adımı (örnek)
+ZC_THRESHOLD = 0.0  # Sıfır geçişi için en küçük genlik farkı
+SSC_THRESHOLD = 0.0  # Eğim işaret değişimi için en küçük çarpım
+HIST_BINS = 3  # Histogram kutu sayısı
+HIST_RANGE = 3.0  # Histogram aralığı: ± HIST_RANGE * pencere std
+
+FEATURE_NAMES = ["rms", "mav", "wl", "zc", "ssc"] + [f"hist{i}" for i in range(HIST_BINS)]
+
+
+def combine_channels(forearm, wrist=None):
+    """Forearm (16) ve wrist (12) dizilerini (T, 28) tek diziye birleştir"""
+    forearm = np.asarray(forearm, dtype=np.float32)
+    if wrist is None:
+        return forearm
+    return np.hstack([forearm, np.asarray(wrist, dtype=np.float32)])
+
+
+def window_features(windows, zc_threshold=ZC_THRESHOLD, ssc_threshold=SSC_THRESHOLD,
+                    hist_bins=HIST_BINS, hist_range=HIST_RANGE):
+    """(W, N, C) pencerelerinden (W, C * F) öznitelik matrisi (kanal sırasına göre)"""
+    x = windows
+    n = x.shape[1]
+    d = np.diff(x, axis=1)
+
+    rms = np.sqrt(np.mean(x * x, axis=1))
+    mav = np.mean(np.abs(x), axis=1)
+    wl = np.sum(np.abs(d), axis=1)
+    zc = np.count_nonzero((x[:, :-1] * x[:, 1:] < 0) & (np.abs(d) >= zc_threshold), axis=1)
+    ssc = np.count_nonzero(-(d[:, :-1] * d[:, 1:]) > ssc_threshold, axis=1)
+
+    # Her pencere kendi std'sine göre ölçeklenir; aralık dışı değerler uç kutulara düşer
+    std = np.std(x, axis=1, keepdims=True) + 1e-12
+    idx = np.floor((x / std + hist_range) * (hist_bins / (2 * hist_range)))
+    idx = np.clip(idx, 0, hist_bins - 1)
+    hist = [np.count_nonzero(idx == b, axis=1) / n for b in range(hist_bins)]
+
+    feats = np.stack([rms, mav, wl, zc, ssc, *hist], axis=-1).astype(np.float32)
+    return feats.reshape(feats.shape[0], -1)
+
+
+def extract_features(signal, wrist=None, window=WINDOW_SIZE, step=WINDOW_STEP, **kwargs):
+    """Tüm deneme için toplu öznitelik çıkarımı: (T, C) -> (W, C * F)"""
+    x = combine_channels(signal, wrist)
+    n_channels = x.shape[1]
+    if len(x) < window:
+        return np.empty((0, n_channels * (5 + kwargs.get("hist_bins", HIST_BINS))), dtype=np.float32)
+    windows = sliding_window_view(x, window, axis=0)[::step]  # (W, C, N) görünüm, kopya yok
+    return window_features(windows.transpose(0, 2, 1), **kwargs)
+
+
+class FeatureExtractor:
+    """Akış parçaları için artımlı öznitelik çıkarıcı
+
+    update() yalnızca tamamlanan pencerelerin özniteliklerini döndürür; sonuç
+    aynı sinyale extract_features uygulanmasıyla birebir aynıdır.
+    """
+
+    def __init__(self, window=WINDOW_SIZE, step=WINDOW_STEP, **kwargs):
+        self.window = window
+        self.step = step
+        self.kwargs = kwargs
+        self._buffer = None
+
+    def reset(self):
+        self._buffer = None
+
+    def update(self, forearm, wrist=None):
+        chunk = combine_channels(forearm, wrist)
+        buf = chunk if self._buffer is None else np.concatenate([self._buffer, chunk])
+        n_windows = (len(buf) - self.window) // self.step + 1 if len(buf) >= self.window else 0
+        if n_windows == 0:
+            self._buffer = buf
+            return extract_features(buf[:0], window=self.window, step=self.step, **self.kwargs)
+        used = (n_windows - 1) * self.step + self.window
+        feats = extract_features(buf[:used], window=self.window, step=self.step, **self.kwargs)
+        self._buffer = buf[n_windows * self.step:]
+        return feats
@@ -0,0 +1,51 @@
+"""EMG için durum taşıyan band geçiren + şebeke çentik filtresi (ikinci derece bölümler)"""
+import numpy as np
+from scipy.signal import butter, iirnotch, tf2sos, sosfilt, sosfilt_zi
+from modules.mod_gesture_emg import SAMPLING_RATE
+
+BANDPASS_LOW = 20.0  # Hz
+BANDPASS_HIGH = 450.0  # Hz
+BANDPASS_ORDER = 4
+NOTCH_FREQ = 50.0  # Şebeke frekansı (Hz); 60 Hz şebekede değiştirilmeli
+NOTCH_Q = 30.0
+
+
+def design_sos(fs=SAMPLING_RATE, low=BANDPASS_LOW, high=BANDPASS_HIGH, order=BANDPASS_ORDER,
+               notch_freq=NOTCH_FREQ, notch_q=NOTCH_Q):
+    """Band geçiren ve çentik filtrelerini tek SOS dizisinde birleştir"""
+    sections = [butter(order, [low, high], btype="bandpass", fs=fs, output="sos")]
+    if notch_freq:
+        b, a = iirnotch(notch_freq, notch_q, fs=fs)
+        sections.append(tf2sos(b, a))
+    return np.vstack(sections)
+
+
+class EMGFilter:
+    """Parçalar arasında filtre durumunu taşıyarak tüm kanalları birlikte süzer
+
+    İlk parçada durum, ilk örneğin kararlı hal yanıtıyla başlatılır; böylece
+    başlangıç geçici etkisi oluşmaz ve geçmiş yeniden süzülmez.
+    """
+
+    def __init__(self, fs=SAMPLING_RATE, **kwargs):
+        self.fs = fs
+        self.sos = design_sos(fs=fs, **kwargs)
+        self._sos_by_dtype = {np.dtype(np.float64): self.sos, np.dtype(np.float32): self.sos.astype(np.float32)}
+        self._zi_unit = sosfilt_zi(self.sos)  # (bölüm, 2)
+        self._zi = None
+
+    def reset(self):
+        self._zi = None
+
+    def process(self, chunk):
+        """(T, C) parçayı süz; float32 girdi float32, diğerleri float64 döner"""
+        x = np.asarray(chunk)
+        dtype = np.dtype(np.float32) if x.dtype == np.float32 else np.dtype(np.float64)
+        x = x.astype(dtype, copy=False)
+        if len(x) == 0:
+            return x
+        if self._zi is None or self._zi.shape[2] != x.shape[1]:
+            self._zi = self._zi_unit[:, :, None] * x[0]
+        sos = self._sos_by_dtype[dtype]
+        y, self._zi = sosfilt(sos, x, axis=0, zi=self._zi.astype(dtype, copy=False))
+        return y
@@ -0,0 +1,133 @@
+"""EMG soket protokolü: ikili çerçeve (başlık + ham little-endian örnekler) ve JSON uyumluluk modu
+
+Çerçeve düzeni:
+    başlık (HEADER_SIZE bayt, little-endian) + forearm örnekleri + wrist örnekleri
+FLAG_ZLIB bayrağı varsa iki örnek bloğu birlikte zlib ile sıkıştırılmıştır.
+"""
+import json
+import time
+import zlib
+import struct
+from collections import namedtuple
+import numpy as np
+
+MAGIC = b"EMGF"
+VERSION = 1
+FLAG_ZLIB = 0x01
+ZLIB_LEVEL = 1  # Hızlı, hafif sıkıştırma
+
+# magic, sürüm, bayraklar, dtype kodu, ayrılmış, sıra no, zaman damgası,
+# hareket indeksi, örnek sayısı, forearm kanal, wrist kanal, yük uzunluğu
+HEADER = struct.Struct("<4sBBBBIdhIHHI")
+HEADER_SIZE = HEADER.size
+
+DTYPE_CODES = {1: np.dtype("<f4"), 2: np.dtype("<f8"), 3: np.dtype("<i2")}
+CODE_BY_DTYPE = {dt: code for code, dt in DTYPE_CODES.items()}
+
+EMGFrame = namedtuple("EMGFrame", ["seq", "timestamp", "gesture", "forearm", "wrist"])
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _as_le(arr, dtype):
+    return np.ascontiguousarray(arr, dtype=dtype)
+
+
+def encode_frame(seq, forearm, wrist, gesture=-1, timestamp=None, dtype="<f4", compress=False):
+    """Çerçeveyi gönderilecek tampon listesi olarak üret (kopyasız memoryview'lar)"""
+    dtype = np.dtype(dtype).newbyteorder("<")
+    if dtype not in CODE_BY_DTYPE:
+        raise ValueError(f"Desteklenmeyen dtype: {dtype}")
+    forearm = _as_le(forearm, dtype)
+    wrist = _as_le(wrist, dtype)
+    if len(forearm) != len(wrist):
+        raise ValueError("Forearm ve wrist örnek sayıları eşit olmalı")
+
+    buffers = [memoryview(forearm).cast("B"), memoryview(wrist).cast("B")]
+    flags = 0
+    if compress:
+        compressor = zlib.compressobj(ZLIB_LEVEL)
+        buffers = [compressor.compress(buffers[0]) + compressor.compress(buffers[1]) + compressor.flush()]
+        flags |= FLAG_ZLIB
+    payload_len = sum(len(b) for b in buffers)
+
+    header = HEADER.pack(MAGIC, VERSION, flags, CODE_BY_DTYPE[dtype], 0, seq & 0xFFFFFFFF,
+                         time.time() if timestamp is None else timestamp, gesture, len(forearm),
+                         forearm.shape[1], wrist.shape[1], payload_len)
+    return [header] + buffers
+
+
+def send_frame(sock, seq, forearm, wrist, **kwargs):
+    for buf in encode_frame(seq, forearm, wrist, **kwargs):
+        sock.sendall(buf)
+
+
+def encode_json(forearm, wrist):
+    """Eski istemciler için satır sonlu JSON yükü"""
+    return (json.dumps({
+        "forearm": np.asarray(forearm).tolist(),
+        "wrist": np.asarray(wrist).tolist()
+    }) + "\n").encode("utf-8")
+
+
+def _decode_payload(header, payload):
+    magic, version, flags, code, _, seq, timestamp, gesture, n, forearm_ch, wrist_ch, _ = header
+    dtype = DTYPE_CODES.get(code)
+    if dtype is None:
+        raise ProtocolError(f"Bilinmeyen dtype kodu: {code}")
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    forearm_len = n * forearm_ch * dtype.itemsize
+    if len(payload) != forearm_len + n * wrist_ch * dtype.itemsize:
+        raise ProtocolError("Yük uzunluğu başlıkla uyuşmuyor")
+    forearm = np.frombuffer(payload, dtype=dtype, count=n * forearm_ch).reshape(n, forearm_ch)
+    wrist = np.frombuffer(payload, dtype=dtype, offset=forearm_len).reshape(n, wrist_ch)
+    return EMGFrame(seq, timestamp, gesture, forearm, wrist)
+
+
+def _parse_header(data):
+    header = HEADER.unpack_from(data)
+    if header[0] != MAGIC:
+        raise ProtocolError("Geçersiz çerçeve başlangıcı")
+    if header[1] != VERSION:
+        raise ProtocolError(f"Desteklenmeyen sürüm: {header[1]}")
+    return header
+
+
+class FrameDecoder:
+    """Referans çözücü: gelen bayt akışını besle, tamamlanan çerçeveleri al"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        self._buffer += data
+        frames = []
+        while len(self._buffer) >= HEADER_SIZE:
+            header = _parse_header(self._buffer)
+            end = HEADER_SIZE + header[-1]
+            if len(self._buffer) < end:
+                break
+            frames.append(_decode_payload(header, bytes(self._buffer[HEADER_SIZE:end])))
+            del self._buffer[:end]
+        return frames
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    while n:
+        received = sock.recv_into(view, n)
+        if not received:
+            raise ConnectionError("Bağlantı kapandı")
+        view = view[received:]
+        n -= received
+    return buf
+
+
+def recv_frame(sock):
+    """Soketten tek bir çerçeve oku (engelleyen referans istemci)"""
+    header = _parse_header(_recv_exact(sock, HEADER_SIZE))
+    return _decode_payload(header, bytes(_recv_exact(sock, header[-1])))
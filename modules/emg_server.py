@@ -0,0 +1,133 @@
+"""Birden çok aboneye EMG çerçevelerini dağıtan asyncio yayın sunucusu
+
+Sunucu kendi iş parçacığındaki olay döngüsünde çalışır. publish() hiçbir zaman
+beklemez: her istemcinin sınırlı bir kuyruğu vardır ve kuyruk doluysa en eski
+çerçeve atılır. Böylece yavaş bir istemci üreticiyi veya arayüzü durduramaz.
+"""
+import asyncio
+import threading
+
+SERVER_HOST = "0.0.0.0"
+SERVER_PORT = 5001
+CLIENT_QUEUE_SIZE = 32  # İstemci başına bekleyebilecek en fazla çerçeve
+
+
+class _Client:
+    def __init__(self, peer, queue_size):
+        self.peer = peer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+
+class EMGStreamServer:
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, queue_size=CLIENT_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.published = 0
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def start(self):
+        if self.running:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        if self._error:
+            raise self._error
+        print(f"📡 EMG yayın sunucusu dinliyor: {self.host}:{self.port}")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+        self._thread = None
+        print("🛑 EMG yayın sunucusu durduruldu.")
+
+    def publish(self, data):
+        """Çerçeveyi tüm istemcilere dağıt (herhangi bir iş parçacığından, beklemeden)"""
+        if self.running:
+            try:
+                self._loop.call_soon_threadsafe(self._broadcast, bytes(data))
+            except RuntimeError:
+                pass  # Döngü bu arada kapandı
+
+
+    def stats(self):
+        clients = list(self._clients)
+        return {
+            "clients": len(clients),
+            "published": self.published,
+            "dropped": sum(c.dropped for c in clients),
+            "per_client": [
+                {"peer": c.peer, "queue": c.queue.qsize(), "max_queue": c.max_depth,
+                 "sent": c.sent, "dropped": c.dropped}
+                for c in clients
+            ],
+        }
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port))
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            self._loop.close()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+            self._clients.clear()
+
+    def _broadcast(self, data):
+        self.published += 1
+        for client in self._clients:
+            if client.queue.full():
+                client.queue.get_nowait()  # En eskiyi at
+                client.dropped += 1
+            client.queue.put_nowait(data)
+            client.max_depth = max(client.max_depth, client.queue.qsize())
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(writer.get_extra_info("peername"), self.queue_size)
+        self._clients.add(client)
+        print(f"🔗 Yayın istemcisi bağlandı: {client.peer}")
+        try:
+            while True:
+                data = await client.queue.get()
+                writer.write(data)
+                await writer.drain()
+                client.sent += 1
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(client)
+            writer.close()
+            print(f"❌ Yayın istemcisi ayrıldı: {client.peer}")
@@ -0,0 +1,190 @@
+"""GRABMyo .mat dosyalarını bellek eşlemeli (memmap) sütunsal depoya dönüştürür.
+
+Kullanım:
+    python -m modules.emg_store --input "E:/.../Output BM" --output "E:/.../Output BM/emg_store"
+"""
+import os
+import re
+import json
+import glob
+import argparse
+import numpy as np
+from scipy.io import loadmat
+
+INDEX_FILE = "index.json"
+FOREARM_FILE = "forearm.bin"
+WRIST_FILE = "wrist.bin"
+STORE_DTYPES = ("float32", "int16")
+FILE_PATTERN = re.compile(r"session(\d+)_participant(\d+)\.mat$")
+INT16_MAX = 32767
+INT16_MIN_LEVELS = 1000  # Sabit ölçekte en büyük genliğin karşılık gelmesi gereken en az int16 seviyesi
+
+# Aynı katılımcı birden fazla klasörde varsa öncelik sırası (load_random_emg ile aynı)
+DIR_PRIORITY = ["Session{s}_converted", "Session{s}", ""]
+
+
+def find_participant_files(data_path):
+    """(session, participant) -> .mat yolu eşlemesini döndür"""
+    found = {}
+    for path in glob.glob(os.path.join(data_path, "**", "session*_participant*.mat"), recursive=True):
+        match = FILE_PATTERN.search(os.path.basename(path))
+        if not match:
+            continue
+        session, participant = int(match.group(1)), int(match.group(2))
+        parent = os.path.relpath(os.path.dirname(path), data_path).replace("\\", "/")
+        parent = "" if parent == "." else parent
+        priorities = [d.format(s=session) for d in DIR_PRIORITY]
+        rank = priorities.index(parent) if parent in priorities else len(priorities)
+        key = (session, participant)
+        if key not in found or rank < found[key][0]:
+            found[key] = (rank, path)
+    return {key: path for key, (_, path) in sorted(found.items())}
+
+
+def _int16_scale(cells, fixed_scale=None):
+    """Dosyadaki en büyük mutlak değere göre int16 ölçeği; sabit ölçek verilirse taşma/çözünürlük denetlenir"""
+    peak = max((float(np.abs(np.asarray(c, dtype=np.float64)).max()) for c in cells if np.size(c)), default=0.0)
+    if fixed_scale is None:
+        return INT16_MAX / peak if peak > 0 else 1.0
+    if peak * fixed_scale > INT16_MAX:
+        raise ValueError(f"int16 ölçeği {fixed_scale:g} ile en büyük değer ({peak:g}) taşıyor")
+    if 0 < peak * fixed_scale < INT16_MIN_LEVELS:
+        raise ValueError(f"int16 ölçeği {fixed_scale:g} ile en büyük değer ({peak:g}) yalnızca "
+                         f"{peak * fixed_scale:.2g} seviyeye düşüyor; sinyal kaybolur")
+    return fixed_scale
+
+
+def _to_store_dtype(cell, dtype, scale):
+    arr = np.asarray(cell)
+    if dtype == np.int16:
+        arr = np.clip(np.rint(arr * scale), -32768, 32767)
+    return np.ascontiguousarray(arr, dtype=dtype)
+
+
+def convert_dataset(data_path, out_dir, dtype="float32", int16_scale=None):
+    """Tüm katılımcı dosyalarını bir kez okuyup depoya yaz
+
+    int16 depoda ölçek varsayılan olarak her dosyanın en büyük genliği int16 sınırına denk gelecek
+    şekilde dosya başına seçilir ve indekse yazılır; int16_scale verilirse taşma veya
+    yetersiz çözünürlük durumunda dönüştürme reddedilir.
+    """
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"Desteklenmeyen dtype: {dtype}")
+    dtype = np.dtype(dtype)
+    os.makedirs(out_dir, exist_ok=True)
+
+    files = find_participant_files(data_path)
+    if not files:
+        print(f"⚠️ {data_path} altında .mat dosyası bulunamadı.")
+        return 0
+
+    entries = []
+    file_scales = []  # [session, participant, ölçek]
+    offsets = {"forearm": 0, "wrist": 0}
+    with open(os.path.join(out_dir, FOREARM_FILE), "wb") as f_forearm, \
+            open(os.path.join(out_dir, WRIST_FILE), "wb") as f_wrist:
+        outputs = {"forearm": f_forearm, "wrist": f_wrist}
+        for (session, participant), path in files.items():
+            data = loadmat(path, variable_names=["DATA_FOREARM", "DATA_WRIST"])
+            cells = {"forearm": data["DATA_FOREARM"], "wrist": data["DATA_WRIST"]}
+            n_trials, n_gestures = cells["forearm"].shape
+            scale = 1.0
+            if dtype == np.int16:
+                scale = _int16_scale(list(cells["forearm"].flat) + list(cells["wrist"].flat), int16_scale)
+                file_scales.append([session, participant, scale])
+            for trial in range(n_trials):
+                for gesture in range(n_gestures):
+                    entry = [session, participant, trial, gesture]
+                    for part in ("forearm", "wrist"):
+                        arr = _to_store_dtype(cells[part][trial, gesture], dtype, scale)
+                        if arr.ndim != 2:
+                            arr = arr.reshape(0, 0)
+                        outputs[part].write(memoryview(arr).cast("B"))
+                        entry += [offsets[part], arr.shape[0], arr.shape[1]]
+                        offsets[part] += arr.size
+                    entries.append(entry)
+            print(f"✅ session{session}_participant{participant} dönüştürüldü.")
+
+    index = {
+        "dtype": dtype.name,
+        "scale": 1.0,
+        "file_scales": file_scales,
+        "source": os.path.abspath(data_path),
+        "columns": ["session", "participant", "trial", "gesture",
+                    "forearm_offset", "forearm_rows", "forearm_cols",
+                    "wrist_offset", "wrist_rows", "wrist_cols"],
+        "entries": entries,
+    }
+    # İndeks en son yazılır; yarım kalan dönüşüm geçerli depo gibi görünmez
+    tmp_path = os.path.join(out_dir, INDEX_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(out_dir, INDEX_FILE))
+    print(f"💾 {len(entries)} deneme {out_dir} dizinine yazıldı.")
+    return len(entries)
+
+
+class EMGStore:
+    """Dönüştürülmüş depodan denemeleri kopyasız memmap dilimleri olarak sunar"""
+
+    def __init__(self, store_dir):
+        with open(os.path.join(store_dir, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.store_dir = store_dir
+        self.dtype = np.dtype(index["dtype"])
+        self.scale = index.get("scale", 1.0)  # Eski depolarda tüm dosyalar için tek ölçek
+        self.file_scales = {(s, p): scale for s, p, scale in index.get("file_scales", [])}
+        self.forearm = self._open(os.path.join(store_dir, FOREARM_FILE))
+        self.wrist = self._open(os.path.join(store_dir, WRIST_FILE))
+        self.entries = {tuple(e[:4]): tuple(e[4:]) for e in index["entries"]}
+
+    def _open(self, path):
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="r")
+
+    @staticmethod
+    def exists(store_dir):
+        return os.path.exists(os.path.join(store_dir, INDEX_FILE))
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def keys(self):
+        return self.entries.keys()
+
+    def get(self, session, participant, trial, gesture_idx, raw=False):
+        """(forearm, wrist) görünümlerini döndür; yoksa (None, None)
+
+        int16 depoda raw=False ise ölçek geri alınır (bu durumda kopya oluşur).
+        """
+        entry = self.entries.get((session, participant, trial, gesture_idx))
+        if entry is None:
+            return None, None
+        f_off, f_rows, f_cols, w_off, w_rows, w_cols = entry
+        forearm = self.forearm[f_off:f_off + f_rows * f_cols].reshape(f_rows, f_cols)
+        wrist = self.wrist[w_off:w_off + w_rows * w_cols].reshape(w_rows, w_cols)
+        if self.dtype == np.int16 and not raw:
+            scale = self.file_scales.get((session, participant), self.scale)
+            forearm = forearm.astype(np.float32) / scale
+            wrist = wrist.astype(np.float32) / scale
+        return forearm, wrist
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRABMyo .mat -> memmap depo dönüştürücü")
+    parser.add_argument("--input", required=True, help="'Output BM' dizini")
+    parser.add_argument("--output", help="Depo dizini (varsayılan: <input>/emg_store)")
+    parser.add_argument("--dtype", choices=STORE_DTYPES, default="float32")
+    parser.add_argument("--int16-scale", type=float, default=None,
+                        help="int16 depolamada sabit çarpan (varsayılan: dosya başına en büyük genlikten)")
+    args = parser.parse_args()
+    convert_dataset(args.input, args.output or os.path.join(args.input, "emg_store"),
+                    dtype=args.dtype, int16_scale=args.int16_scale)
+
+
+if __name__ == "__main__":
+    main()
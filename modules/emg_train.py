@@ -0,0 +1,171 @@
+"""GRABMyo EMG verisinden doğrudan hareket sınıflandırıcı eğitimi
+
+Katılımcı başına yükleme ve öznitelik çıkarımı süreç havuzunda paralel yürür.
+
+Kullanım:
+    python -m modules.emg_train --split subject --workers 8
+"""
+import os
+import time
+import argparse
+import numpy as np
+import joblib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scipy.io import loadmat
+from sklearn.neural_network import MLPClassifier
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import make_pipeline
+from sklearn.metrics import accuracy_score
+
+from modules import mod_gesture_emg
+from modules.emg_store import EMGStore
+from modules.emg_features import combine_channels, extract_features, WINDOW_SIZE
+from modules.emg_filter import EMGFilter
+
+EMG_MODEL_PATH = "./modules/gesturemodel/model_emg.pkl"
+TRAIN_STEP = 256  # Eğitimde pencereler örtüşmesiz alınır
+TEST_FRACTION = 0.2  # "subject" bölmesinde teste ayrılan katılımcı oranı
+TEST_SESSION = 3  # "session" bölmesinde test oturumu
+INDEX_TO_GESTURE = {v: k for k, v in mod_gesture_emg.GESTURE_TO_INDEX.items()}
+
+
+def participant_jobs(manifest):
+    """Manifesti (session, participant) -> [(trial, gesture), ...] işlerine böl"""
+    jobs = {}
+    for session, participant, trial, gesture_idx in manifest.entries:
+        if gesture_idx in INDEX_TO_GESTURE:
+            jobs.setdefault((session, participant), []).append((trial, gesture_idx))
+    return jobs
+
+
+def _extract_participant(session, participant, trials, mat_path, store_path, window, step, use_filter):
+    # Alt süreçte çalışır; önbellek yerine dosya/depo doğrudan bir kez açılır
+    if store_path:
+        store = EMGStore(store_path)
+        get = lambda t, g: store.get(session, participant, t, g)
+    else:
+        data = loadmat(mat_path, variable_names=mod_gesture_emg.MAT_VARIABLES)
+        get = lambda t, g: (data["DATA_FOREARM"][t, g], data["DATA_WRIST"][t, g])
+
+    X, y = [], []
+    for trial, gesture_idx in trials:
+        x = combine_channels(*get(trial, gesture_idx))
+        if use_filter:
+            x = EMGFilter().process(x)
+        feats = extract_features(x, window=window, step=step)
+        X.append(feats)
+        y.append(np.full(len(feats), gesture_idx, dtype=np.int16))
+    return session, participant, np.concatenate(X), np.concatenate(y)
+
+
+def build_dataset(workers=None, window=WINDOW_SIZE, step=TRAIN_STEP, use_filter=True):
+    """Tüm katılımcıların özniteliklerini paralel çıkarıp tek matriste birleştir
+
+    Dönüş: X, y (hareket indeksi), sessions, participants (satır başına)
+    """
+    manifest = mod_gesture_emg.get_manifest()
+    store_path = mod_gesture_emg.STORE_PATH if mod_gesture_emg.get_store() is not None else None
+    jobs = participant_jobs(manifest)
+    if not jobs:
+        raise RuntimeError("Manifestte eğitim için uygun deneme yok")
+
+    results = []
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_extract_participant, session, participant, trials,
+                            manifest.files.get((session, participant)), store_path, window, step, use_filter)
+            for (session, participant), trials in jobs.items()
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            session, participant, X, y = future.result()
+            results.append((session, participant, X, y))
+            print(f"📥 {i}/{len(futures)} session{session}_participant{participant}: {len(y)} pencere")
+
+    results.sort(key=lambda r: (r[0], r[1]))  # Tamamlanma sırasından bağımsız, tekrarlanabilir sıra
+    X = np.concatenate([r[2] for r in results])
+    y = np.concatenate([r[3] for r in results])
+    sessions = np.concatenate([np.full(len(r[3]), r[0], dtype=np.int16) for r in results])
+    participants = np.concatenate([np.full(len(r[3]), r[1], dtype=np.int16) for r in results])
+    print(f"✅ {X.shape[0]} pencere x {X.shape[1]} öznitelik, {time.time() - start:.1f} sn")
+    return X, y, sessions, participants
+
+
+def split_indices(split, sessions, participants, test_fraction=TEST_FRACTION, test_session=TEST_SESSION, seed=0):
+    """Katılımcılar arası ("subject") veya oturumlar arası ("session") eğitim/test maskesi"""
+    if split == "subject":
+        ids = np.unique(participants)
+        rng = np.random.default_rng(seed)
+        n_test = max(1, int(round(len(ids) * test_fraction)))
+        test_mask = np.isin(participants, rng.choice(ids, size=n_test, replace=False))
+    elif split == "session":
+        test_mask = sessions == test_session
+    elif split == "none":
+        test_mask = np.zeros(len(sessions), dtype=bool)
+    else:
+        raise ValueError(f"Bilinmeyen bölme: {split}")
+    return ~test_mask, test_mask
+
+
+def make_classifier(kind="mlp"):
+    if kind == "lda":
+        return make_pipeline(StandardScaler(), LinearDiscriminantAnalysis())
+    return make_pipeline(
+        StandardScaler(),
+        MLPClassifier(hidden_layer_sizes=(64, 32), max_iter=200, early_stopping=True)
+    )
+
+
+def train_emg_model(split="subject", workers=None, classifier="mlp", window=WINDOW_SIZE, step=TRAIN_STEP,
+                    use_filter=True, model_path=EMG_MODEL_PATH):
+    X, y, sessions, participants = build_dataset(workers, window, step, use_filter)
+    labels = np.array([INDEX_TO_GESTURE[i] for i in range(len(INDEX_TO_GESTURE))])[y]
+    train_mask, test_mask = split_indices(split, sessions, participants)
+
+    start = time.time()
+    model = make_classifier(classifier)
+    model.fit(X[train_mask], labels[train_mask])
+    print(f"🧠 Model {time.time() - start:.1f} sn'de eğitildi ({train_mask.sum()} pencere).")
+
+    accuracy = None
+    if test_mask.any():
+        accuracy = accuracy_score(labels[test_mask], model.predict(X[test_mask]))
+        print(f"📊 {split} bölmesi test doğruluğu: {accuracy * 100:.2f}%")
+
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump({
+        "model": model,
+        "window": window,
+        "step": step,
+        "filter": use_filter,
+        "split": split,
+        "accuracy": accuracy,
+    }, model_path)
+    print(f"💾 EMG modeli kaydedildi: {model_path}")
+    return model, accuracy
+
+
+def load_emg_model(model_path=EMG_MODEL_PATH):
+    if os.path.exists(model_path):
+        return joblib.load(model_path)
+    print("⚠️ EMG model dosyası bulunamadı.")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRABMyo EMG hareket sınıflandırıcı eğitimi")
+    parser.add_argument("--split", choices=["subject", "session", "none"], default="subject")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--classifier", choices=["mlp", "lda"], default="mlp")
+    parser.add_argument("--window", type=int, default=WINDOW_SIZE)
+    parser.add_argument("--step", type=int, default=TRAIN_STEP)
+    parser.add_argument("--no-filter", action="store_true", help="Band geçiren/çentik filtresini atla")
+    parser.add_argument("--output", default=EMG_MODEL_PATH)
+    args = parser.parse_args()
+    train_emg_model(split=args.split, workers=args.workers, classifier=args.classifier, window=args.window,
+                    step=args.step, use_filter=not args.no_filter, model_path=args.output)
+
+
+if __name__ == "__main__":
+    main()
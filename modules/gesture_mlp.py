@@ -0,0 +1,116 @@
+import numpy as np
+
+PARITY_SAMPLES = 256  # Parite kontrolünde kullanılan rastgele örnek sayısı
+PARITY_TOLERANCE = 1e-6  # sklearn ile olasılıklar arasında izin verilen en büyük fark
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "tanh": lambda x: np.tanh(x, out=x),
+    "logistic": lambda x: np.divide(1.0, np.add(1.0, np.exp(np.negative(x, out=x), out=x), out=x), out=x),
+    "identity": lambda x: x,
+}
+
+
+class NumpyMLP:
+    """sklearn Pipeline(StandardScaler, MLPClassifier) modelinin saf NumPy ileri geçişi
+
+    StandardScaler ilk katmana katlanır (W1' = W1 / scale, b1' = b1 - (mean / scale) @ W1).
+    Tek örnek için katman tamponları önceden ayrılır; tahmin başına bellek ayrılmaz ve
+    sklearn'ün girdi doğrulama yükü olmaz.
+    """
+
+    def __init__(self, weights, biases, classes, activation="relu", out_activation="softmax"):
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Desteklenmeyen aktivasyon: {activation}")
+        self.weights = [np.ascontiguousarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float64) for b in biases]
+        self.classes_ = np.asarray(classes)
+        self.activation = activation
+        self.out_activation = out_activation
+        self.n_features = self.weights[0].shape[0]
+        # Tek örneklik (1, n) tamponlar: giriş + her katmanın çıkışı
+        self._input = np.zeros((1, self.n_features))
+        self._buffers = [np.zeros((1, w.shape[1])) for w in self.weights]
+        self._proba = np.zeros((1, len(self.classes_)))
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Pipeline(StandardScaler, MLPClassifier) veya tek MLPClassifier'dan dönüştür"""
+        steps = [step for _, step in model.steps] if hasattr(model, "steps") else [model]
+        mlp = steps[-1]
+        if not hasattr(mlp, "coefs_") or len(steps) > 2:
+            raise ValueError("Yalnızca (StandardScaler, MLPClassifier) modelleri dönüştürülebilir")
+        weights = [w.copy() for w in mlp.coefs_]
+        biases = [b.copy() for b in mlp.intercepts_]
+        if len(steps) == 2:
+            scaler = steps[0]
+            mean = scaler.mean_ if scaler.with_mean else np.zeros(weights[0].shape[0])
+            scale = scaler.scale_ if scaler.with_std else np.ones(weights[0].shape[0])
+            biases[0] = biases[0] - (mean / scale) @ weights[0]
+            weights[0] = weights[0] / scale[:, None]
+        return cls(weights, biases, mlp.classes_, mlp.activation, mlp.out_activation_)
+
+    def _forward(self, x, buffers, proba):
+        last = len(self.weights) - 1
+        for i, (w, b, out) in enumerate(zip(self.weights, self.biases, buffers)):
+            np.dot(x, w, out=out)
+            out += b
+            if i < last:
+                ACTIVATIONS[self.activation](out)
+            x = out
+
+        if self.out_activation == "softmax":
+            np.subtract(x, x.max(axis=1, keepdims=True), out=proba)
+            np.exp(proba, out=proba)
+            proba /= proba.sum(axis=1, keepdims=True)
+        else:
+            # İkili sınıflandırma: tek lojistik çıkış -> [1 - p, p]
+            p = 1.0 / (1.0 + np.exp(-x[:, 0]))
+            proba[:, 0] = 1.0 - p
+            proba[:, 1] = p
+        return proba
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        n = len(X)
+        buffers = [np.empty((n, w.shape[1])) for w in self.weights]
+        return self._forward(X, buffers, np.empty((n, len(self.classes_))))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def predict_one(self, features):
+        """Tek örnek için (etiket, olasılıklar); önceden ayrılmış tamponlarla çalışır
+
+        Dönen olasılık dizisi bir sonraki çağrıda üzerine yazılır; saklanacaksa kopyalanmalıdır.
+        """
+        self._input[0] = features
+        proba = self._forward(self._input, self._buffers, self._proba)[0]
+        return self.classes_[proba.argmax()], proba
+
+    def check_parity(self, model, X=None, tolerance=PARITY_TOLERANCE):
+        """sklearn modeliyle aynı olasılık ve etiketleri verdiğini doğrula; en büyük farkı döndür"""
+        if X is None:
+            # Ölçekleyici varsa verinin dağılımına yakın rastgele örnekler üret
+            rng = np.random.default_rng(0)
+            scaler = model.steps[0][1] if hasattr(model, "steps") and len(model.steps) == 2 else None
+            mean = getattr(scaler, "mean_", np.zeros(self.n_features))
+            scale = getattr(scaler, "scale_", np.ones(self.n_features))
+            X = mean + scale * rng.standard_normal((PARITY_SAMPLES, self.n_features))
+        expected = model.predict_proba(X)
+        diff = float(np.abs(self.predict_proba(X) - expected).max())
+        if diff > tolerance or not np.array_equal(self.predict(X), model.classes_[expected.argmax(axis=1)]):
+            raise ValueError(f"NumPy modeli sklearn ile uyuşmuyor (en büyük fark {diff:.2e})")
+        return diff
+
+
+def compile_model(model):
+    """Modeli NumPy yoluna dönüştür ve doğrula; dönüştürülemezse None (sklearn kullanılmaya devam eder)"""
+    try:
+        fast = NumpyMLP.from_sklearn(model)
+        diff = fast.check_parity(model)
+    except Exception as e:
+        print("⚠️ Model NumPy'a dönüştürülemedi, sklearn ile devam ediliyor:", e)
+        return None
+    print(f"⚡ Model NumPy'a dönüştürüldü (sklearn farkı {diff:.1e}).")
+    return fast
@@ -1,17 +1,259 @@
 import numpy as np
-from scipy.interpolate import interp1d
+from scipy.signal import lfilter
+from scipy.stats import trim_mean
 from collections import defaultdict
 import math
 import json
 import os
-import matplotlib.pyplot as plt
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 CALIBRATION_PATH = "calibration_data.json"
+CALIBRATION_PROFILES_PATH = "calibration_profiles.json"
+GRAPH_DIR = "./calibration_graphs"
+GRAPH_HASHES_PATH = f"{GRAPH_DIR}/hashes.json"  # Son çizilen grafiklerin içerik özetleri
+DEFAULT_USER = "varsayılan"
+DEFAULT_CAMERA = "0"
+CAPTURE_FRAMES = 15  # Bir kalibrasyon noktası için toplanan kare sayısı
+TRIM_RATIO = 0.2  # Kırpılmış ortalamada her iki uçtan atılan oran
+
+ANGLE_SPAN = 360.0  # Birleşik düğüm dizisinde parmaklar arası açı kaydırması (açılar 0-180)
+
+
+class CalibrationTable:
+    """Kalibrasyonun derlenmiş parça parça doğrusal hali; beş parmak tek seferde hesaplanır
+
+    Her parmağın açıya göre sıralı düğümleri, parmak başına ANGLE_SPAN kaydırılarak tek
+    dizide birleştirilir. Böylece tek searchsorted çağrısı her açının doğru parçasını bulur;
+    uç parçalar aralık dışında doğrusal devam eder (interp1d "extrapolate" ile aynı).
+    """
+
+    def __init__(self, calibration_data, finger_names):
+        boundaries, slopes, intercepts = [], [], []
+        self.calibrated = np.zeros(len(finger_names), dtype=bool)
+        for f, name in enumerate(finger_names):
+            cal = calibration_data.get(name, {})
+            if f > 0:
+                boundaries.append(f * ANGLE_SPAN - ANGLE_SPAN / 4)  # Önceki parmaktan ayırıcı
+            if len(cal) < 2:
+                slopes.append(0.0)
+                intercepts.append(0.0)
+                continue
+            self.calibrated[f] = True
+            knots = sorted((angle, percent) for percent, angle in cal.items())
+            x = np.array([k[0] for k in knots], dtype=np.float64)
+            y = np.array([k[1] for k in knots], dtype=np.float64)
+            dx = np.diff(x)
+            slope = np.divide(np.diff(y), dx, out=np.zeros_like(dx), where=dx != 0)
+            slopes.extend(slope)
+            intercepts.extend(y[:-1] - slope * x[:-1])
+            boundaries.extend(x[1:-1] + f * ANGLE_SPAN)
+        self.boundaries = np.array(boundaries)
+        self.slopes = np.array(slopes)
+        self.intercepts = np.array(intercepts)
+        self.offsets = np.arange(len(finger_names)) * ANGLE_SPAN
+
+    def __call__(self, angles):
+        """(..., 5) açılardan (..., 5) ham yüzdeler (kalibre edilmemiş parmaklar 0)"""
+        segment = np.searchsorted(self.boundaries, angles + self.offsets, side="right")
+        return self.slopes[segment] * angles + self.intercepts[segment]
+
+
+def aggregate_angles(angles, method="median"):
+    """(N, 5) kare açılarını parmak başına tek değere indir (tek NumPy çağrısı)"""
+    angles = np.asarray(angles, dtype=np.float64)
+    if method == "median":
+        return np.median(angles, axis=0)
+    if method == "trimmed":
+        return trim_mean(angles, TRIM_RATIO, axis=0)
+    raise ValueError(f"Bilinmeyen birleştirme yöntemi: {method}")
+
+
+class CalibrationProfileStore:
+    """Kullanıcı ve kamera başına kalibrasyon profilleri
+
+    Dosya yalnızca açılışta okunur; profiller ve derlenmiş tabloları bellekte tutulur,
+    böylece profil değiştirmek JSON okumadan anında olur. Eski tek profilli
+    calibration_data.json varsa varsayılan profil olarak içe aktarılır.
+    """
+
+    def __init__(self, path=CALIBRATION_PROFILES_PATH):
+        self.path = path
+        self.profiles = {}  # "kullanıcı@kamera": {parmak: {yüzde: açı}}
+        self.tables = {}  # "kullanıcı@kamera": CalibrationTable
+        self.load()
+
+    @staticmethod
+    def key(user, camera):
+        return f"{user}@{camera}"
+
+    def names(self):
+        return sorted(self.profiles)
+
+    def get(self, user, camera):
+        """Profilin kalibrasyon sözlüğü (yoksa boş oluşturulur); estimator bunu doğrudan günceller"""
+        return self.profiles.setdefault(self.key(user, camera), defaultdict(dict))
+
+    def delete(self, user, camera):
+        key = self.key(user, camera)
+        self.profiles.pop(key, None)
+        self.tables.pop(key, None)
+
+    def load(self):
+        raw = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                raw = json.load(f)
+        elif os.path.exists(CALIBRATION_PATH):
+            with open(CALIBRATION_PATH, 'r') as f:
+                raw = {self.key(DEFAULT_USER, DEFAULT_CAMERA): json.load(f)}
+        for key, fingers in raw.items():
+            profile = defaultdict(dict)
+            for finger, values in fingers.items():
+                profile[finger] = {float(k): v for k, v in values.items()}
+            self.profiles[key] = profile
+
+    def save(self):
+        data = {key: {f: dict(v) for f, v in profile.items()} for key, profile in self.profiles.items()}
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+        print("💾 Kalibrasyon profilleri kaydedildi.")
+
+
+profile_store = None
+
+
+def get_profile_store():
+    """Profil deposunu ilk kullanımda bir kez yükle"""
+    global profile_store
+    if profile_store is None:
+        profile_store = CalibrationProfileStore()
+    return profile_store
+
+
+def calibration_hash(cal):
+    """Bir parmağın kalibrasyon noktalarının içerik özeti (sıra bağımsız)"""
+    items = sorted((float(p), float(a)) for p, a in cal.items())
+    return hashlib.sha1(repr(items).encode()).hexdigest()
+
+
+def render_finger_graph(finger, cal, filename):
+    """Tek parmağın kalibrasyon grafiğini pyplot kullanmadan (iş parçacığı güvenli) çiz"""
+    # Kalibrasyon verilerini sırala
+    percents = sorted(cal.keys())
+    angles = [cal[p] for p in percents]
+
+    fig = Figure(figsize=(6, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.scatter(angles, percents, label="Kalibrasyon Noktaları", color='red')
+
+    # Interpolasyon için model belirle
+    x = np.array(angles)
+    y = np.array(percents)
+
+    degree = 1  # default linear
+
+    if len(cal) == 3:
+        degree = 2  # parabol
+    elif len(cal) >= 4:
+        degree = len(cal) - 1  # polinom derecesi nokta sayısına göre
+
+    # Polinom katsayılarını hesapla
+    p = np.polyfit(x, y, deg=degree)
+    poly = np.poly1d(p)
+
+    # Daha düzgün çizim için açı aralığı oluştur
+    x_line = np.linspace(min(x) - 5, max(x) + 5, 200)
+    y_line = poly(x_line)
+
+    ax.plot(x_line, y_line, label=f"{degree}. Derece Polinom Fit", color='blue')
+
+    ax.set_title(f"{finger} Parmak Kalibrasyon Grafiği")
+    ax.set_xlabel("Açı (derece)")
+    ax.set_ylabel("Yüzde (%)")
+    ax.legend()
+    ax.grid(True)
+    fig.savefig(filename)
+
+
+class CalibrationGraphRenderer:
+    """Kalibrasyon grafiklerini tek arka plan iş parçacığında, yalnızca değişenleri çizen yardımcı
+
+    Her parmağın son çizildiği içerik özeti GRAPH_HASHES_PATH'te saklanır; dosya
+    duruyorsa ve özet aynıysa o parmak yeniden çizilmez.
+    """
+
+    def __init__(self, graph_dir=GRAPH_DIR, hashes_path=GRAPH_HASHES_PATH):
+        self.graph_dir = graph_dir
+        self.hashes_path = hashes_path
+        self.hashes = {}
+        if os.path.exists(hashes_path):
+            with open(hashes_path, 'r') as f:
+                self.hashes = json.load(f)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calibration-graphs")
+
+    def filename(self, finger):
+        return f"{self.graph_dir}/{finger}_calibration.png"
+
+    def changed(self, calibration):
+        """Yeniden çizilmesi gereken {parmak: (kalibrasyon, özet)}"""
+        changed = {}
+        with self._lock:
+            for finger, cal in calibration.items():
+                if len(cal) < 2:
+                    continue
+                digest = calibration_hash(cal)
+                if self.hashes.get(finger) != digest or not os.path.exists(self.filename(finger)):
+                    changed[finger] = (cal, digest)
+        return changed
+
+    def submit(self, calibration):
+        for finger, cal in calibration.items():
+            if len(cal) < 2:
+                print(f"⚠️ {finger} için yeterli kalibrasyon verisi yok, grafik çizilemiyor.")
+        changed = self.changed(calibration)
+        if not changed:
+            return None
+        return self._executor.submit(self._render, changed)
+
+    def _render(self, changed):
+        os.makedirs(self.graph_dir, exist_ok=True)
+        for finger, (cal, digest) in changed.items():
+            try:
+                filename = self.filename(finger)
+                render_finger_graph(finger, cal, filename)
+                with self._lock:
+                    self.hashes[finger] = digest
+                print(f"📊 {finger} için grafik kaydedildi: {filename}")
+            except Exception as e:
+                print(f"❌ {finger} grafiği çizilemedi:", e)
+        with self._lock:
+            with open(self.hashes_path, 'w') as f:
+                json.dump(self.hashes, f, indent=2)
+
+
+graph_renderer = None
+
+
+def get_graph_renderer():
+    global graph_renderer
+    if graph_renderer is None:
+        graph_renderer = CalibrationGraphRenderer()
+    return graph_renderer
+
 
 class FingerPercentageEstimator:
-    def __init__(self, smoothing=0.5):
+    def __init__(self, smoothing=0.5, profile=None):
         self.calibration_data = defaultdict(lambda: defaultdict(dict))  # finger: percent: angle
-        self.prev_output = {}  # for low-pass
+        self.prev_output = None  # for low-pass: (5,) son yumuşatılmış yüzdeler
+        self.prev_hands_output = None  # Çoklu el için (H, 5) low-pass durumu
+        self.table = None  # Derlenmiş kalibrasyon; kalibrasyon değişince yeniden derlenir
+        self.profile = None  # Etkin profil anahtarı ("kullanıcı@kamera"); None ise eski tek dosya
         self.smoothing = smoothing
         self.finger_points = {
             "Baş": [0, 2, 4],
@@ -21,55 +263,122 @@ class FingerPercentageEstimator:
             "Serçe": [0, 18, 20],
         }
 
-        self.load_calibration()
+        # Parmak üçgenlerinin landmark indeksleri (5, 3); toplu indeksleme için
+        self.finger_indices = np.array(list(self.finger_points.values()))
+        self._outer_points = self.finger_indices[:, [0, 2]]  # (5, 2) uç noktalar
+        self._joint_points = self.finger_indices[:, [1]]  # (5, 1) açının köşesi
+
+        # profile=(kullanıcı, kamera) verilirse eski tek dosya hiç okunmaz
+        if profile is not None:
+            self.use_profile(*profile)
+        else:
+            self.load_calibration()
 
     def calculate_angle(self, p1, p2, p3):
-        a, b, c = np.array(p1), np.array(p2), np.array(p3)
-        ba = a - b
-        bc = c - b
+        # Açılar 2B (x, y) hesaplanır; kayıtlı kalibrasyonlarla uyum için z kullanılmaz
+        ba = np.subtract(p1[:2], p2[:2], dtype=np.float64)  # float64: sonuç JSON'a yazılabilir kalsın
+        bc = np.subtract(p3[:2], p2[:2], dtype=np.float64)
         cosine = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
         angle = np.arccos(np.clip(cosine, -1.0, 1.0))
         return np.degrees(angle)
 
+    def joint_angles(self, points):
+        """(..., 21, 2|3) landmarklardan (..., 5) parmak açıları; tek seferde, 2B olarak"""
+        xy = np.asarray(points, dtype=np.float64)[..., :2]
+        vec = xy[..., self._outer_points, :] - xy[..., self._joint_points, :]  # (..., 5, 2, 2): ba, bc
+        norms = np.sqrt((vec * vec).sum(-1).prod(-1))  # |ba| * |bc|
+        cosine = (vec[..., 0, :] * vec[..., 1, :]).sum(-1) / (norms + 1e-6)
+        return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+    def compile_calibration(self):
+        """calibration_data doğrudan değiştirildiyse tabloyu yeniden derlemek için çağrılır"""
+        self.table = CalibrationTable(self.calibration_data, list(self.finger_points))
+        if self.profile:
+            get_profile_store().tables[self.profile] = self.table
+        return self.table
+
+    def use_profile(self, user=DEFAULT_USER, camera=DEFAULT_CAMERA):
+        """Kalibrasyonu bellekteki profile geçir (dosya okunmaz, tablo önbellekten gelir)"""
+        store = get_profile_store()
+        self.profile = store.key(user, camera)
+        self.calibration_data = store.get(user, camera)
+        self.table = store.tables.get(self.profile) or self.compile_calibration()
+        self.prev_output = self.prev_hands_output = None  # Süzgeç yeni profilde sıfırdan başlar
+        print(f"👤 Kalibrasyon profili: {self.profile}")
+
+    def estimate_hands(self, hands):
+        """Tüm eller için (H, 5) parmak yüzdeleri; parmak sırası finger_points ile aynı"""
+        table = self.table or self.compile_calibration()
+        raw = table(self.joint_angles(hands.points if hasattr(hands, "points") else hands))
+
+        prev = self.prev_hands_output
+        if prev is None or prev.shape != raw.shape:
+            prev = raw  # El sayısı değiştiyse süzgeç durumu sıfırlanır
+        smooth = self.smoothing * prev + (1 - self.smoothing) * raw
+        self.prev_hands_output = smooth
+        return np.where(table.calibrated, np.clip(smooth, 0, 100), 0)
+
+    def estimate_batch(self, landmarks, smoothing=None, calibration_data=None):
+        """Kayıtlı (N, 21, 2|3) landmark dizisinden (N, 5) yüzdeler
+
+        Kare kare estimate çağrılarıyla aynı sonucu verir (süzgeç ilk kareden başlar) ama
+        açı, interpolasyon ve low-pass tüm zaman ekseninde tek seferde hesaplanır.
+        smoothing / calibration_data verilirse estimator durumu değiştirilmeden onlarla
+        hesaplanır; ayar denemeleri için kullanılır.
+        """
+        if calibration_data is not None:
+            table = CalibrationTable(calibration_data, list(self.finger_points))
+        else:
+            table = self.table or self.compile_calibration()
+        s = self.smoothing if smoothing is None else smoothing
+        raw = table(self.joint_angles(landmarks))
+        if not len(raw):
+            return raw
+        # Nedensel EMA: y[n] = s * y[n-1] + (1 - s) * x[n], y[-1] = x[0]
+        smooth, _ = lfilter([1 - s], [1, -s], raw, axis=0, zi=s * raw[:1])
+        return np.where(table.calibrated, np.clip(smooth, 0, 100), 0)
+
     def calibrate(self, landmarks, percent, finger=None):
         targets = [finger] if finger else self.finger_points.keys()
         for name in targets:
             i1, i2, i3 = self.finger_points[name]
             angle = self.calculate_angle(landmarks[i1], landmarks[i2], landmarks[i3])
             self.calibration_data[name][percent] = angle
+        self.compile_calibration()
         print(f"✅ Kalibrasyon: {finger or 'tümü'} için %{percent}")
 
-    def estimate(self, landmarks):
-        result = {}
-        for name, (i1, i2, i3) in self.finger_points.items():
-            p1, p2, p3 = landmarks[i1], landmarks[i2], landmarks[i3]
-            angle = self.calculate_angle(p1, p2, p3)
-
-            cal = self.calibration_data[name]
-            if len(cal) < 2:
-                result[name] = 0
-                continue
-
-            percents = sorted(cal.keys())
-            angles = [cal[p] for p in percents]
-
-            try:
-                f = interp1d(angles, percents, kind='linear', fill_value="extrapolate", bounds_error=False)
-                raw = float(f(angle))
-                smooth = self._low_pass(name, raw)
-                result[name] = np.clip(smooth, 0, 100)
-            except Exception:
-                result[name] = 0
+    def calibrate_frames(self, frames, percent, finger=None, method="median"):
+        """Birden çok karenin (N, 21, 2|3) açılarını medyan/kırpılmış ortalamayla birleştirip kaydet"""
+        angles = self.joint_angles(frames)  # (N, 5)
+        values = aggregate_angles(angles, method)
+        spread = angles.std(axis=0)
+        targets = [finger] if finger else self.finger_points.keys()
+        for f, name in enumerate(self.finger_points):
+            if name in targets:
+                self.calibration_data[name][percent] = float(values[f])
+        self.compile_calibration()
+        print(f"✅ Kalibrasyon: {finger or 'tümü'} için %{percent} ({len(angles)} kare, "
+              f"en büyük sapma {spread.max():.1f}°)")
+        return values
 
-        return result
+    def estimate(self, landmarks):
+        table = self.table or self.compile_calibration()
+        raw = table(self.joint_angles(landmarks))
+        smooth = self._low_pass(raw, table.calibrated)
+        values = np.where(table.calibrated, np.clip(smooth, 0, 100), 0)
+        return dict(zip(self.finger_points, values.tolist()))
 
-    def _low_pass(self, name, new_val):
-        old_val = self.prev_output.get(name, new_val)
+    def _low_pass(self, new_val, calibrated):
+        # Kalibre edilmemiş parmakların durumu NaN tutulur; kalibre edilince süzgeç ilk değerden başlar
+        old_val = new_val if self.prev_output is None else np.where(np.isnan(self.prev_output), new_val, self.prev_output)
         val = self.smoothing * old_val + (1 - self.smoothing) * new_val
-        self.prev_output[name] = val
+        self.prev_output = np.where(calibrated, val, np.nan)
         return val
 
     def save_calibration(self):
+        if self.profile:
+            get_profile_store().save()
+            return
         data = {f: dict(v) for f, v in self.calibration_data.items()}
         with open(CALIBRATION_PATH, 'w') as f:
             json.dump(data, f, indent=2)
@@ -81,54 +390,19 @@ class FingerPercentageEstimator:
                 raw = json.load(f)
             for finger, values in raw.items():
                 self.calibration_data[finger] = {float(k): v for k, v in values.items()}
+            self.compile_calibration()
             print("✅ Kalibrasyon yüklendi.")
         else:
             print("⚠️ Kalibrasyon dosyası bulunamadı, yeni kalibrasyon yapılmalı.")
 
-    def plot_calibration_graphs(self):
-        os.makedirs("./calibration_graphs", exist_ok=True)
-
-        for finger, cal in self.calibration_data.items():
-            if len(cal) < 2:
-                print(f"⚠️ {finger} için yeterli kalibrasyon verisi yok, grafik çizilemiyor.")
-                continue
-
-            # Kalibrasyon verilerini sırala
-            percents = sorted(cal.keys())
-            angles = [cal[p] for p in percents]
-
-            plt.figure(figsize=(6, 4))
-            plt.scatter(angles, percents, label="Kalibrasyon Noktaları", color='red')
-
-            # Interpolasyon için model belirle
-            x = np.array(angles)
-            y = np.array(percents)
-
-            degree = 1  # default linear
-
-            if len(cal) == 3:
-                degree = 2  # parabol
-            elif len(cal) >= 4:
-                degree = len(cal) - 1  # polinom derecesi nokta sayısına göre
-
-            # Polinom katsayılarını hesapla
-            p = np.polyfit(x, y, deg=degree)
-            poly = np.poly1d(p)
-
-            # Daha düzgün çizim için açı aralığı oluştur
-            x_line = np.linspace(min(x) - 5, max(x) + 5, 200)
-            y_line = poly(x_line)
-
-            plt.plot(x_line, y_line, label=f"{degree}. Derece Polinom Fit", color='blue')
-
-            plt.title(f"{finger} Parmak Kalibrasyon Grafiği")
-            plt.xlabel("Açı (derece)")
-            plt.ylabel("Yüzde (%)")
-            plt.legend()
-            plt.grid(True)
+    def plot_calibration_graphs(self, wait=False):
+        """Yalnızca kalibrasyonu değişen parmakların grafiklerini arka planda çiz
 
-            # Dosya adı güvenli yap
-            filename = f"./calibration_graphs/{finger}_calibration.png"
-            plt.savefig(filename)
-            plt.close()
-            print(f"📊 {finger} için grafik kaydedildi: {filename}")
+        Çizim Tk iş parçacığını bekletmez; değişen parmak yoksa hiç iş başlatılmaz.
+        wait=True verilirse çizim bitene kadar beklenir.
+        """
+        snapshot = {finger: dict(cal) for finger, cal in self.calibration_data.items()}
+        future = get_graph_renderer().submit(snapshot)
+        if future is not None and wait:
+            future.result()
+        return future
@@ -2,7 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
+import numpy as np
 from modules.arduino import ArduinoComm
+from modules.mod_finger_percentage import (FingerPercentageEstimator, get_profile_store, CAPTURE_FRAMES,
+                                           DEFAULT_USER, DEFAULT_CAMERA)
 
 ANGLE_MAP_PATH = "angle_map.json"
 
@@ -14,7 +17,8 @@ class FingerPercentageUI:
             widget.destroy()
 
         self.selected_finger = tk.StringVar(value="Tümü")
-        self._last_landmarks = None
+        self._capture = None  # Süren çok kareli kalibrasyon: (yüzde, parmak, kare sayısı, yöntem, kareler)
+        self._profile = (DEFAULT_USER, DEFAULT_CAMERA)  # Tk iş parçacığında güncellenen (kullanıcı, kamera)
         self.sending = False
         self.arduino = None
         self.angle_map = self.load_angle_map()
@@ -25,6 +29,29 @@ class FingerPercentageUI:
         self.last_sent_angles = [None] * 5         # Önceki gönderilen açıları tutar
 
         ttk.Label(root, text="Parmak Yüzdesi", font=("Arial", 12)).pack(pady=5)
+
+        # Kullanıcı / kamera profili: profiller bellekte tutulur, geçiş anında olur
+        profile_frame = ttk.LabelFrame(root, text="Kalibrasyon Profili")
+        profile_frame.pack(pady=5, fill="x", padx=10)
+        self.profile_user = tk.StringVar(value=DEFAULT_USER)
+        self.profile_camera = tk.StringVar(value=DEFAULT_CAMERA)
+        ttk.Label(profile_frame, text="Kullanıcı:").pack(side="left")
+        self.user_box = ttk.Combobox(profile_frame, textvariable=self.profile_user, width=12,
+                                     values=self.profile_users())
+        self.user_box.pack(side="left", padx=2)
+        ttk.Label(profile_frame, text="Kamera:").pack(side="left")
+        tk.Entry(profile_frame, textvariable=self.profile_camera, width=4).pack(side="left", padx=2)
+        ttk.Button(profile_frame, text="Geç", command=self.switch_profile).pack(side="left", padx=2)
+
+        capture_frame = ttk.Frame(root)
+        capture_frame.pack(pady=2)
+        self.capture_frames = tk.IntVar(value=CAPTURE_FRAMES)
+        self.capture_method = tk.StringVar(value="median")
+        ttk.Label(capture_frame, text="Kare sayısı:").pack(side="left")
+        tk.Entry(capture_frame, textvariable=self.capture_frames, width=4).pack(side="left", padx=2)
+        ttk.OptionMenu(capture_frame, self.capture_method, "median", "median", "trimmed").pack(side="left")
+        self.capture_status = tk.StringVar(value="")
+        ttk.Label(root, textvariable=self.capture_status).pack()
         ttk.Label(root, text="Parmak Seç (opsiyonel)").pack()
 
         fingers = ["Tümü", "Baş", "İşaret", "Orta", "Yüzük", "Serçe"]
@@ -111,25 +138,71 @@ class FingerPercentageUI:
     def update_interval_label(self, *_):
         self.interval_label.config(text=f"{self.send_interval.get()} ms")
 
+    def profile_users(self):
+        return sorted({key.rsplit("@", 1)[0] for key in get_profile_store().names()} | {DEFAULT_USER})
+
+    def get_estimator(self):
+        if not hasattr(self, 'estimator'):
+            # Video iş parçacığından da çağrılır; Tk değişkenleri yerine önbellekteki profil kullanılır
+            self.estimator = FingerPercentageEstimator(profile=self._profile)
+        return self.estimator
+
+    def switch_profile(self):
+        self.profile_user.set(self.profile_user.get().strip() or DEFAULT_USER)
+        self.profile_camera.set(self.profile_camera.get().strip() or DEFAULT_CAMERA)
+        self._capture = None
+        self._profile = (self.profile_user.get(), self.profile_camera.get())
+        if hasattr(self, 'estimator'):
+            self.estimator.use_profile(*self._profile)
+        else:
+            self.get_estimator()
+        self.user_box.config(values=self.profile_users())
+        self.capture_status.set(f"👤 Profil: {self.estimator.profile}")
+
     def calibrate(self, percent):
-        if self._last_landmarks and hasattr(self, 'estimator'):
-            finger = None if self.selected_finger.get() == "Tümü" else self.selected_finger.get()
-            self.estimator.calibrate(self._last_landmarks, percent, finger)
+        # Tek kare yerine sonraki karelerin açıları toplanıp birleştirilir
+        # Tk değişkenleri burada (Tk iş parçacığında) bir kez okunur; video iş parçacığı yalnızca kare ekler
+        try:
+            count = self.capture_frames.get()
+        except tk.TclError:
+            count = 0
+        if count < 1:
+            messagebox.showerror("Hata", "Kare sayısı pozitif bir tam sayı olmalı.")
+            return
+        finger = None if self.selected_finger.get() == "Tümü" else self.selected_finger.get()
+        self._capture = (percent, finger, count, self.capture_method.get(), [])
+        self.capture_status.set(f"⏳ %{percent:.0f} için kareler toplanıyor...")
+
+    def _feed_capture(self, landmarks):
+        if self._capture is None:
+            return
+        percent, finger, count, method, frames = self._capture
+        frames.append(landmarks.points)
+        if len(frames) >= count:
+            self._capture = None
+            self.get_estimator().calibrate_frames(np.stack(frames), percent, finger, method)
+            self.capture_status.set(f"✅ %{percent:.0f} kalibre edildi ({len(frames)} kare)")
 
     def apply_custom(self):
         self.calibrate(self.custom_percent.get())
 
     def update_from_landmarks(self, landmarks):
-        self._last_landmarks = landmarks
-        if not hasattr(self, 'estimator'):
-            from modules.mod_finger_percentage import FingerPercentageEstimator
-            self.estimator = FingerPercentageEstimator()
-        result = self.estimator.estimate(landmarks)
+        self._feed_capture(landmarks)
+        result = self.get_estimator().estimate(landmarks)
         for i, (name, val) in enumerate(result.items()):
             if name in self.labels:
                 self.labels[name].set(f"{val:.0f}%")
             self.current_values[i] = int(val)
 
+    def update_from_hands(self, hands):
+        """Çoklu el modu: tüm eller tek çağrıda hesaplanır, gönderim ilk el için yapılır"""
+        self._feed_capture(hands[0])
+        result = self.get_estimator().estimate_hands(hands)  # (H, 5)
+        for i, name in enumerate(self.estimator.finger_points):
+            if name in self.labels:
+                self.labels[name].set(" / ".join(f"{v:.0f}%" for v in result[:, i]))
+            self.current_values[i] = int(result[0, i])
+
     def toggle_sending(self):
         self.sending = not self.sending
         if self.sending:
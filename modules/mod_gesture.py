@@ -7,6 +7,8 @@ import joblib
 from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import make_pipeline
+from modules.gesture_mlp import compile_model
+from utils.landmarks import get_bounding_box
 
 try:
     from modules.arduino import ArduinoComm
@@ -15,6 +17,9 @@ except ImportError:
 
 POZ_DIR = "./modules/pozlar"
 MODEL_PATH = "./modules/gesturemodel/model.pkl"
+PREDICT_INTERVAL = 1 / 30  # NumPy yolunda her yeni kare sınıflandırılır (sn)
+SKLEARN_PREDICT_INTERVAL = 0.3  # Model dönüştürülemezse eski tahmin aralığı (sn)
+SEND_INTERVAL = 0.3  # Aynı tahmin Arduino'ya en fazla bu aralıkla tekrar gönderilir (sn)
 
 if not os.path.exists(POZ_DIR):
     os.makedirs(POZ_DIR)
@@ -22,6 +27,7 @@ if not os.path.exists(os.path.dirname(MODEL_PATH)):
     os.makedirs(os.path.dirname(MODEL_PATH))
 
 current_landmarks = None
+current_hands = None  # Çoklu el modunda karedeki tüm eller (HandsFrame)
 arduino = None  # Arduino bağlantısı bu modül içinde tanımlı
 
 # ✅ Gesture -> Servo yüzdeleri eşleşmesi
@@ -48,19 +54,19 @@ def set_current_landmarks(landmarks):
     global current_landmarks
     current_landmarks = landmarks
 
+def set_current_hands(hands):
+    global current_hands
+    current_hands = hands
+
+def predict_hands(model, hands):
+    """Karedeki tüm ellerin pozlarını tek model çağrısıyla tahmin et"""
+    return model.predict(hands.flat_xy)
+
 def set_current_frame(frame):
     pass
 
-def get_bounding_box(landmarks, margin=20):
-    coords = np.array(landmarks)[:, :2]
-    x_min = int(np.min(coords[:, 0])) - margin
-    y_min = int(np.min(coords[:, 1])) - margin
-    x_max = int(np.max(coords[:, 0])) + margin
-    y_max = int(np.max(coords[:, 1])) + margin
-    return x_min, y_min, x_max, y_max
-
 def augment_and_save_direct(landmarks, label, writer):
-    flat = np.array(landmarks).flatten()
+    flat = landmarks.flat_xy
     for _ in range(4):
         noisy = flat + np.random.normal(0, 0.5, size=flat.shape)
         writer.writerow(noisy)
@@ -107,6 +113,11 @@ def train_model():
     return model
 
 def start_live_prediction(model, label_widget, send_callback=None):
+    # sklearn'ün tek örnek yükü olmadan her karede tahmin için NumPy'a dönüştür
+    fast = compile_model(model)
+    predictor = fast or model
+    interval = PREDICT_INTERVAL if fast else SKLEARN_PREDICT_INTERVAL
+
     def loop():
         global arduino
         if ArduinoComm and arduino is None:
@@ -117,29 +128,49 @@ def start_live_prediction(model, label_widget, send_callback=None):
                 print("⚠️ Arduino bağlanamadı.")
                 arduino = None
 
+        last_seen, last_text = None, None
+        last_sent, last_sent_time = None, 0.0
         while True:
             try:
-                if current_landmarks is not None:
-                    flat = np.array(current_landmarks).flatten().reshape(1, -1)
-                    pred = model.predict(flat)[0]
-
-                    # ✅ UI’ye yaz
-                    try:
-                        if label_widget and label_widget.winfo_exists():
-                            label_widget.config(text=f"🤖 Tahmin: {pred}")
-                    except Exception as ui_err:
-                        print("⚠️ UI güncellenemedi:", ui_err)
-
-                    # ✅ Eğer dışarıdan gönderim fonksiyonu verilmişse çağır
-                    if send_callback:
-                        send_callback(pred)
-                    elif arduino and pred in GESTURE_TO_SERVO:
-                        arduino.send_percentages(GESTURE_TO_SERVO[pred])
+                hands, landmarks = current_hands, current_landmarks
+                source = hands if hands is not None and len(hands) > 1 else landmarks
+                # Yalnızca yeni gelen kare sınıflandırılır
+                if source is not None and source is not last_seen:
+                    last_seen = source
+                    if source is hands:
+                        # Çoklu el: tüm eller tek çağrıda sınıflandırılır, gönderim ilk el için yapılır
+                        preds = predict_hands(predictor, hands)
+                        pred = preds[0]
+                        text = " | ".join(f"{side or i + 1}: {p}" for i, (side, p) in enumerate(zip(hands.handedness, preds)))
+                    else:
+                        if fast:
+                            pred = fast.predict_one(landmarks.flat_xy)[0]
+                        else:
+                            pred = model.predict(landmarks.flat_xy.reshape(1, -1))[0]
+                        text = pred
+
+                    # ✅ UI’ye yaz (yalnızca değiştiğinde)
+                    if text != last_text:
+                        last_text = text
+                        try:
+                            if label_widget and label_widget.winfo_exists():
+                                label_widget.config(text=f"🤖 Tahmin: {text}")
+                        except Exception as ui_err:
+                            print("⚠️ UI güncellenemedi:", ui_err)
+
+                    # ✅ Tahmin değiştiğinde hemen, aynıysa SEND_INTERVAL aralıkla gönder
+                    now = time.time()
+                    if pred != last_sent or now - last_sent_time >= SEND_INTERVAL:
+                        last_sent, last_sent_time = pred, now
+                        if send_callback:
+                            send_callback(pred)
+                        elif arduino and pred in GESTURE_TO_SERVO:
+                            arduino.send_percentages(GESTURE_TO_SERVO[pred])
 
             except Exception as e:
                 print("❌ Tahmin hatası:", e)
 
-            time.sleep(0.3)
+            time.sleep(interval)
 
     threading.Thread(target=loop, daemon=True).start()
 
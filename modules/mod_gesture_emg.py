@@ -1,13 +1,31 @@
 import os
+import json
 import random
+import time
+import threading
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from scipy.io import loadmat
+from modules.emg_store import EMGStore, find_participant_files, INDEX_FILE
 
 # Sabitler
 DATA_PATH = "E:/emg_data/gesture-recognition-and-biometrics-electromyogram-grabmyo-1.1.0/Output BM"
 FORARM_CHANNELS = 16  # Dokümantasyona göre
 WRIST_CHANNELS = 12  # Dokümantasyona göre
-MAX_ATTEMPTS = 20  # Maksimum deneme sayısı
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Katılımcı önbelleği bellek sınırı (1 GB)
+CACHE_MAX_ENTRIES = 8  # Önbellekte tutulacak en fazla katılımcı dosyası
+MAT_VARIABLES = ["DATA_FOREARM", "DATA_WRIST"]  # .mat dosyasından okunacak değişkenler
+STORE_PATH = f"{DATA_PATH}/emg_store"  # modules/emg_store.py ile üretilen memmap depo
+MANIFEST_PATH = f"{DATA_PATH}/emg_manifest.json"  # Geçerli denemelerin önbelleğe alınmış listesi
+PREFETCH_WORKERS = 2  # Arka plan yükleme iş parçacığı sayısı
+PREFETCH_DEPTH = 3  # Her hareket için hazırda tutulacak deneme sayısı
+PREFETCH_TOP_K = 2  # Olasılığa göre ayrıca hazırlanacak hareket sayısı
+PREFETCH_RETRY_INTERVAL = 5.0  # Yüklenemeyen hareket bu süre boyunca yeniden denenmez (sn)
+SAMPLING_RATE = 2048  # GRABMyo örnekleme frekansı (Hz)
+STREAM_CHUNK = 128  # Akışta bir parçadaki örnek sayısı
+CROSSFADE_SAMPLES = 64  # Hareket değiştiğinde denemeler arası geçiş uzunluğu
+STREAM_RETRY_INTERVAL = 2.0  # Akışta verisi yüklenemeyen hareket için yeniden deneme aralığı (sn)
 
 GESTURE_TO_INDEX = {
     'Lateral Prehension': 0,
@@ -48,46 +66,508 @@ def validate_data(forearm, wrist):
     return True, "Geçerli"
 
 
+class EMGCache:
+    """Çözümlenmiş katılımcı dosyaları için boyut sınırlı LRU önbellek"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_entries=CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # anahtar -> (veri, bayt)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return  # Sınırdan büyük girdi önbelleğe alınmaz
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            self._evict()
+
+    def configure(self, max_bytes=None, max_entries=None):
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        # En eski kullanılanlardan başlayarak sınırlara inene kadar çıkar
+        while self._entries and (self.current_bytes > self.max_bytes
+                                 or len(self._entries) > self.max_entries):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+
+
+emg_cache = EMGCache()
+
+
+def configure_cache(max_bytes=None, max_entries=None):
+    """Önbellek sınırlarını güncelle"""
+    emg_cache.configure(max_bytes=max_bytes, max_entries=max_entries)
+
+
+def get_cache_stats():
+    """Önbellek isabet/ıska sayaçlarını döndür"""
+    return emg_cache.stats()
+
+
+def load_participant(path):
+    """Katılımcı dosyasını önbellekten veya diskten yükle"""
+    data = emg_cache.get(path)
+    if data is None:
+        raw = loadmat(path, variable_names=MAT_VARIABLES)
+        data = {name: raw[name] for name in MAT_VARIABLES}
+        nbytes = sum(getattr(cell, "nbytes", 0) for arr in data.values() for cell in arr.flat)
+        emg_cache.put(path, data, nbytes)
+    return data
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Dönüştürülmüş depo varsa bir kez açıp döndür"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None and EMGStore.exists(STORE_PATH):
+                _store = EMGStore(STORE_PATH)
+                print(f"📦 EMG deposu açıldı: {len(_store)} deneme")
+    return _store
+
+
+class EMGManifest:
+    """validate_data'dan geçen (session, participant, trial, gesture) kayıtlarının indeksi"""
+
+    def __init__(self, files, entries, signature=None, data_path=None):
+        self.files = files  # (session, participant) -> .mat yolu
+        self.entries = entries
+        self.signature = signature if signature is not None else source_signature(files)
+        self.data_path = data_path or DATA_PATH
+        self.by_gesture = {}
+        for session, participant, trial, gesture_idx in entries:
+            self.by_gesture.setdefault(gesture_idx, []).append((session, participant, trial))
+        self._filtered = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def candidates(self, gesture_idx, min_session=1, max_session=3, max_subject=43, max_trial=6):
+        """Hareket ve sınırlara uyan kayıtlar (filtre sonucu bir kez hesaplanır)"""
+        key = (gesture_idx, min_session, max_session, max_subject, max_trial)
+        result = self._filtered.get(key)
+        if result is None:
+            result = [e for e in self.by_gesture.get(gesture_idx, [])
+                      if min_session <= e[0] <= max_session and e[1] <= max_subject and e[2] <= max_trial]
+            self._filtered[key] = result
+        return result
+
+    def is_current(self):
+        """Kaydedildiği veri yolu ve kaynak dosyalar (boyut, değiştirilme zamanı) hâlâ aynı mı"""
+        return self.data_path == DATA_PATH and self.signature == source_signature(find_participant_files(DATA_PATH))
+
+    def save(self, path):
+        data = {
+            "data_path": self.data_path,
+            "signature": self.signature,
+            "files": [[s, p, path] for (s, p), path in self.files.items()],
+            "entries": self.entries,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        files = {(s, p): file_path for s, p, file_path in data["files"]}
+        # Eski manifestlerde imza yoktur; boş imza is_current'ta yeniden oluşturmayı tetikler
+        return cls(files, [tuple(e) for e in data["entries"]], data.get("signature", {}), data.get("data_path", ""))
+
+
+def source_signature(files):
+    """Manifestin dayandığı dosyaların yol -> [boyut, değiştirilme zamanı] özeti"""
+    paths = list(files.values())
+    if EMGStore.exists(STORE_PATH):
+        paths.append(os.path.join(STORE_PATH, INDEX_FILE))
+    signature = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        signature[path] = [st.st_size, int(st.st_mtime)]
+    return signature
+
+
+def build_manifest():
+    """Veri setini bir kez tarayıp geçerli kayıtların manifestini oluştur"""
+    files = find_participant_files(DATA_PATH)
+    entries = []
+    store = get_store()
+    if store is not None:
+        for key in sorted(store.keys()):
+            forearm, wrist = store.get(*key, raw=True)
+            if validate_data(forearm, wrist)[0]:
+                entries.append(key)
+    else:
+        for (session, participant), path in files.items():
+            try:
+                data = loadmat(path, variable_names=MAT_VARIABLES)
+            except Exception as e:
+                print(f"⚠️ {path} okunamadı: {e}")
+                continue
+            n_trials, n_gestures = data["DATA_FOREARM"].shape
+            for trial in range(n_trials):
+                for gesture_idx in range(n_gestures):
+                    forearm = data["DATA_FOREARM"][trial, gesture_idx]
+                    wrist = data["DATA_WRIST"][trial, gesture_idx]
+                    if validate_data(forearm, wrist)[0]:
+                        entries.append((session, participant, trial, gesture_idx))
+    return EMGManifest(files, entries)
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest(rebuild=False):
+    """Manifesti diskten yükle; yoksa veya veri değiştiyse oluşturup verinin yanına kaydet
+
+    Boş manifest (veri henüz yok) kaydedilmez ve bellekte tutulmaz; veri eklenince bir sonraki çağrı yeniden tarar.
+    """
+    global _manifest
+    if _manifest is None or rebuild:
+        with _manifest_lock:
+            if _manifest is None or rebuild:
+                manifest = None
+                if os.path.exists(MANIFEST_PATH) and not rebuild:
+                    try:
+                        manifest = EMGManifest.load(MANIFEST_PATH)
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"⚠️ Manifest okunamadı: {e}")
+                    if manifest is not None and not manifest.is_current():
+                        print("🔄 EMG verisi değişmiş, manifest yeniden oluşturuluyor...")
+                        manifest = None
+                if manifest is None:
+                    manifest = build_manifest()
+                    if not len(manifest):
+                        print("⚠️ Geçerli EMG kaydı bulunamadı; manifest kaydedilmedi.")
+                        return manifest
+                    try:
+                        manifest.save(MANIFEST_PATH)
+                        print(f"💾 EMG manifesti kaydedildi: {len(manifest)} kayıt")
+                    except OSError as e:
+                        print(f"⚠️ Manifest kaydedilemedi: {e}")
+                _manifest = manifest
+    return _manifest
+
+
+def load_emg(session, subject, trial, gesture_idx):
+    """Belirli bir denemeyi depodan veya önbellekli .mat dosyasından yükle"""
+    store = get_store()
+    if store is not None:
+        return store.get(session, subject, trial, gesture_idx)
+    data = load_participant(get_manifest().files[(session, subject)])
+    return data["DATA_FOREARM"][trial, gesture_idx], data["DATA_WRIST"][trial, gesture_idx]
+
+
 def load_random_emg(gesture_name, min_session=1, max_session=3, max_subject=43, max_trial=6):
     """Rastgele EMG verisi yükle"""
     if gesture_name not in GESTURE_TO_INDEX:
         return None, None, "Tanımsız hareket"
 
     gesture_idx = GESTURE_TO_INDEX[gesture_name]
+    candidates = get_manifest().candidates(gesture_idx, min_session, max_session, max_subject, max_trial)
+    if not candidates:
+        return None, None, "Uygun veri bulunamadı"
 
-    for attempt in range(MAX_ATTEMPTS):
-        try:
-            # Rastgele seçim
-            session = random.randint(min_session, max_session)
-            subject = random.randint(1, max_subject)
-            trial = random.randint(0, max_trial)
-
-            # Dosya yolu oluştur (farklı formatları deneyelim)
-            path_variants = [
-                f"{DATA_PATH}/Session{session}_converted/session{session}_participant{subject}.mat",
-                f"{DATA_PATH}/Session{session}/session{session}_participant{subject}.mat",
-                f"{DATA_PATH}/session{session}_participant{subject}.mat"
-            ]
-
-            for path in path_variants:
-                if os.path.exists(path):
-                    data = loadmat(path)
-                    forearm = data["DATA_FOREARM"][trial, gesture_idx]
-                    wrist = data["DATA_WRIST"][trial, gesture_idx]
+    # Manifestteki kayıtlar zaten doğrulanmış; deneme/yanılma gerekmez
+    session, subject, trial = random.choice(candidates)
+    try:
+        forearm, wrist = load_emg(session, subject, trial, gesture_idx)
+    except Exception as e:
+        return None, None, f"Yükleme hatası: {e}"
+    return forearm, wrist, None
+
+
+class EMGPrefetcher:
+    """Tahmin edilen ve olası sonraki hareketler için denemeleri arka planda hazırlar"""
+
+    def __init__(self, depth=PREFETCH_DEPTH, workers=PREFETCH_WORKERS, top_k=PREFETCH_TOP_K, loader=None):
+        self.depth = depth
+        self.top_k = top_k
+        self.loader = loader or load_random_emg
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="emg-prefetch")
+        self._queues = {}  # hareket -> hazır (forearm, wrist) kuyruğu
+        self._pending = {}  # hareket -> yüklenmekte olan deneme sayısı
+        self._failed = {}  # hareket -> (yeniden deneme zamanı, hata); olumsuz sonuç önbelleği
+        self._lock = threading.Lock()
+        self._closed = False
+        self.targets = []
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, gesture, probabilities=None):
+        """Güncel tahmini ve varsa {hareket: olasılık} sözlüğünü bildir"""
+        targets = [gesture]
+        if probabilities:
+            ranked = sorted(probabilities.items(), key=lambda kv: kv[1], reverse=True)
+            targets += [g for g, _ in ranked if g != gesture][:self.top_k]
+        self.targets = targets
+        for target in targets:
+            self._fill(target)
+
+    def get(self, gesture):
+        """Hazır denemeyi bellekten ver; yoksa eşzamanlı yükle"""
+        if gesture not in GESTURE_TO_INDEX:
+            return self.loader(gesture)
+        with self._lock:
+            failed = self._failed_error(gesture)
+            if failed is not None:
+                return None, None, failed
+            queue = self._queues.get(gesture)
+            item = queue.popleft() if queue else None
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if item is None:
+            forearm, wrist, err = self.loader(gesture)
+        else:
+            (forearm, wrist), err = item, None
+        self._fill(gesture)
+        return forearm, wrist, err
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "queue_depths": {g: len(q) for g, q in self._queues.items()},
+                "pending": sum(self._pending.values()),
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fill(self, gesture):
+        if gesture not in GESTURE_TO_INDEX:
+            return
+        with self._lock:
+            if self._closed or self._failed_error(gesture) is not None:
+                return
+            queue = self._queues.setdefault(gesture, deque())
+            missing = self.depth - len(queue) - self._pending.get(gesture, 0)
+            if missing <= 0:
+                return
+            self._pending[gesture] = self._pending.get(gesture, 0) + missing
+        for _ in range(missing):
+            self._executor.submit(self._load, gesture)
 
-                    # Validasyon
-                    is_valid, msg = validate_data(forearm, wrist)
-                    if is_valid:
-                        return forearm, wrist, None
-                    else:
-                        print(f"Geçersiz veri: {msg}")
-                        break
+    def _failed_error(self, gesture):
+        """Hareket yakın zamanda yüklenemediyse hatası, yoksa None (kilit altında çağrılır)"""
+        failed = self._failed.get(gesture)
+        if failed is None or time.monotonic() >= failed[0]:
+            return None
+        return failed[1]
 
+    def _load(self, gesture):
+        with self._lock:
+            skip = self._failed_error(gesture) is not None
+            if skip:
+                self._pending[gesture] -= 1
+        if skip:
+            return  # Aynı hareketin önceki işi başarısız oldu; kuyruktaki diğer işler atlanır
+        try:
+            forearm, wrist, err = self.loader(gesture)
         except Exception as e:
-            print(f"Deneme {attempt + 1} hata: {str(e)}")
-            continue
+            forearm, wrist, err = None, None, str(e)
+        with self._lock:
+            self._pending[gesture] -= 1
+            if forearm is not None:
+                self._queues[gesture].append((forearm, wrist))
+                self._failed.pop(gesture, None)
+                return
+            # Hata her başarısız denemede değil, hareket hatalı duruma geçtiğinde bir kez yazdırılır
+            report = self._failed_error(gesture) is None
+            self._failed[gesture] = (time.monotonic() + PREFETCH_RETRY_INTERVAL, err or "Veri yüklenemedi")
+        if report:
+            print(f"Ön yükleme hatası ({gesture}): {err}")
+
+
+EMGChunk = namedtuple("EMGChunk", ["seq", "timestamp", "gesture", "forearm", "wrist", "error"])
+
+
+class EMGReplayStream:
+    """Denemeleri örnekleme hızında sabit boyutlu parçalar halinde oynatan akış
+
+    gesture_source: güncel hareket adını döndüren fonksiyon
+    loader: hareket adı -> (forearm, wrist, err); varsayılan load_random_emg
+    speed: 1.0 gerçek zaman, >1 daha hızlı, 0 beklemeden (yük testi için)
+    """
+
+    def __init__(self, gesture_source, loader=None, chunk_size=STREAM_CHUNK, fs=SAMPLING_RATE,
+                 speed=1.0, crossfade=CROSSFADE_SAMPLES):
+        self.gesture_source = gesture_source
+        self.loader = loader or load_random_emg
+        self.chunk_size = chunk_size
+        self.fs = fs
+        self.speed = speed
+        self.crossfade = crossfade
+        self.gesture = None
+        self.seq = 0
+        self.late_chunks = 0
+        self.error = None  # Son yükleme hatası; veri yüklenene kadar parçalarla birlikte bildirilir
+        self._failed = None  # (hareket, yeniden deneme zamanı)
+        self._segments = deque()  # Sırayla oynatılacak (forearm, wrist) parçaları
+        self._offset = 0
+        self._t0 = None
+        self._stopped = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._stopped:
+            raise StopIteration
+
+        gesture = self.gesture_source()
+        if gesture != self.gesture:
+            self._switch(gesture)
+
+        forearm, wrist = self._take(self.chunk_size)
+        self._pace()
+        chunk = EMGChunk(self.seq, time.time(), self.gesture, forearm, wrist, self.error)
+        self.seq += 1
+        return chunk
+
+    def stop(self):
+        self._stopped = True
+
+    def _load(self, gesture):
+        # Yüklenemeyen hareket her parçada değil, STREAM_RETRY_INTERVAL aralıkla yeniden denenir
+        if self._failed and self._failed[0] == gesture and time.monotonic() < self._failed[1]:
+            return None
+        forearm, wrist, err = self.loader(gesture)
+        if forearm is None:
+            self.error = err or "Veri yüklenemedi"
+            self._failed = (gesture, time.monotonic() + STREAM_RETRY_INTERVAL)
+            return None
+        self.error = self._failed = None
+        return np.asarray(forearm, dtype=np.float32), np.asarray(wrist, dtype=np.float32)
+
+    def _switch(self, gesture):
+        self.gesture = gesture
+        new = self._load(gesture)
+        if new is None:
+            self._segments.clear()
+            self._offset = 0
+            return
+
+        old = self._segments[0] if self._segments else None
+        n = 0
+        if old is not None and self.crossfade > 0:
+            n = min(self.crossfade, len(old[0]) - self._offset, len(new[0]))
+        if n > 0:
+            # Eski denemenin kalanı ile yenisinin başı doğrusal olarak karıştırılır
+            w = np.linspace(0.0, 1.0, n, dtype=np.float32)[:, None]
+            o = self._offset
+            head = tuple(prev[o:o + n] * (1 - w) + cur[:n] * w for prev, cur in zip(old, new))
+            self._segments = deque([head, (new[0][n:], new[1][n:])])
+        else:
+            self._segments = deque([new])
+        self._offset = 0
+
+    def _take(self, n):
+        parts_f, parts_w = [], []
+        need = n
+        while need > 0:
+            if not self._segments:
+                nxt = self._load(self.gesture)
+                if nxt is None:
+                    break
+                self._segments.append(nxt)  # Deneme bitti: aynı hareketten yenisini ekle
+            forearm, wrist = self._segments[0]
+            take = min(need, len(forearm) - self._offset)
+            parts_f.append(forearm[self._offset:self._offset + take])
+            parts_w.append(wrist[self._offset:self._offset + take])
+            self._offset += take
+            need -= take
+            if self._offset >= len(forearm):
+                self._segments.popleft()
+                self._offset = 0
+
+        if need > 0:
+            # Veri yoksa zaman çizelgesi bozulmasın diye sessizlik gönderilir
+            parts_f.append(np.zeros((need, FORARM_CHANNELS), dtype=np.float32))
+            parts_w.append(np.zeros((need, WRIST_CHANNELS), dtype=np.float32))
+        if len(parts_f) == 1:
+            return parts_f[0], parts_w[0]
+        return np.concatenate(parts_f), np.concatenate(parts_w)
 
-    return None, None, f"{MAX_ATTEMPTS} denemede uygun veri bulunamadı"
+    def _pace(self):
+        if not self.speed:
+            return
+        now = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = now
+        period = self.chunk_size / (self.fs * self.speed)
+        deadline = self._t0 + (self.seq + 1) * period
+        delay = deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -1.0:
+            # Bir saniyeden fazla geride kalındıysa toplu gönderim yerine saati yeniden hizala
+            self.late_chunks += 1
+            self._t0 = now - (self.seq + 1) * period
 
 
 def load_random_emg_by_index(index, **kwargs):
@@ -1,14 +1,21 @@
 import tkinter as tk
 from tkinter import ttk
 from modules import mod_gesture, mod_gesture_emg
+from modules.emg_filter import EMGFilter
+from modules import emg_protocol
+from modules.emg_server import EMGStreamServer, SERVER_PORT
+from modules.gesture_mlp import compile_model
 import numpy as np
 import time
 import threading
-import json
 import socket
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
+PLOT_SAMPLES = 1024  # Grafikte gösterilen son örnek sayısı
+PLOT_INTERVAL = 0.25  # Grafik yenileme aralığı (sn)
+PROTOCOLS = ["JSON", "Binary", "Binary + zlib"]  # Soket gönderim biçimleri
+
 class EMGGestureUI:
     def __init__(self, parent, return_callback):
         self.parent = parent
@@ -31,6 +38,13 @@ class EMGGestureUI:
         self.canvas = FigureCanvasTkAgg(fig, master=self.frame)
         self.canvas.get_tk_widget().pack()
 
+        self.filter_enabled = True
+        self.forearm_filter = EMGFilter()
+        self.wrist_filter = EMGFilter()
+        self.filter_var = tk.BooleanVar(value=self.filter_enabled)
+        ttk.Checkbutton(self.frame, text="Band Geçiren + Çentik Filtresi", variable=self.filter_var,
+                        command=self.toggle_filter).pack()
+
         ip_port_frame = ttk.Frame(self.frame)
         ip_port_frame.pack(pady=5)
         ttk.Label(ip_port_frame, text="IP:").grid(row=0, column=0)
@@ -41,12 +55,31 @@ class EMGGestureUI:
         self.port_entry = ttk.Entry(ip_port_frame, width=6)
         self.port_entry.insert(0, "5000")
         self.port_entry.grid(row=0, column=3)
+        ttk.Label(ip_port_frame, text="Protokol:").grid(row=1, column=0, pady=(5, 0))
+        self.protocol_var = tk.StringVar(value=PROTOCOLS[0])
+        ttk.OptionMenu(ip_port_frame, self.protocol_var, PROTOCOLS[0], *PROTOCOLS,
+                       command=self.set_protocol).grid(row=1, column=1, columnspan=3, sticky="w", pady=(5, 0))
+        self.protocol = PROTOCOLS[0]
+        self.tx_seq = 0
+        self.send_lock = threading.Lock()  # Çerçeveler farklı iş parçacıklarından karışmasın
 
         self.send_socket = False
         self.socket_client = None
         self.toggle_btn = ttk.Button(self.frame, text="Canlı Socket Gönderimini Başlat", command=self.toggle_socket)
         self.toggle_btn.pack(pady=5)
 
+        server_frame = ttk.Frame(self.frame)
+        server_frame.pack(pady=5)
+        ttk.Label(server_frame, text="Yayın Portu:").grid(row=0, column=0)
+        self.server_port_entry = ttk.Entry(server_frame, width=6)
+        self.server_port_entry.insert(0, str(SERVER_PORT))
+        self.server_port_entry.grid(row=0, column=1, padx=5)
+        self.server = None
+        self.server_btn = ttk.Button(server_frame, text="Yayın Sunucusunu Başlat", command=self.toggle_server)
+        self.server_btn.grid(row=0, column=2)
+        self.server_label = ttk.Label(self.frame, text="Yayın: kapalı", font=("Arial", 9))
+        self.server_label.pack()
+
         manual_frame = ttk.Frame(self.frame)
         manual_frame.pack(pady=10)
         ttk.Label(manual_frame, text="Manuel Gesture Index (0-15):").grid(row=0, column=0)
@@ -57,6 +90,8 @@ class EMGGestureUI:
         ttk.Button(self.frame, text="Geri Dön", command=self.exit_and_save).pack(pady=10)
 
         self.model = mod_gesture.load_model()
+        self.fast_model = compile_model(self.model) if self.model else None  # sklearn yükü olmadan tahmin
+        self.prefetcher = mod_gesture_emg.EMGPrefetcher()
         self.running = True
 
         threading.Thread(target=self.predict_loop, daemon=True).start()
@@ -65,6 +100,51 @@ class EMGGestureUI:
     def update_from_landmarks(self, landmarks):
         mod_gesture.set_current_landmarks(landmarks)
 
+    def toggle_filter(self):
+        # Yeniden açıldığında eski filtre durumu kullanılmasın
+        self.forearm_filter.reset()
+        self.wrist_filter.reset()
+        self.filter_enabled = self.filter_var.get()
+
+    def set_protocol(self, value):
+        self.protocol = value
+
+    def send_emg(self, forearm, wrist, gesture):
+        """Seçili protokole göre EMG bloğunu sokete gönder"""
+        with self.send_lock:
+            if self.protocol == "JSON":
+                self.socket_client.sendall(emg_protocol.encode_json(forearm, wrist))
+            else:
+                gesture_idx = mod_gesture_emg.GESTURE_TO_INDEX.get(gesture, -1)
+                emg_protocol.send_frame(self.socket_client, self.tx_seq, forearm, wrist, gesture=gesture_idx,
+                                        compress=self.protocol == "Binary + zlib")
+            self.tx_seq += 1
+
+    def toggle_server(self):
+        if self.server and self.server.running:
+            self.server.stop()
+            self.server = None
+            self.server_btn.config(text="Yayın Sunucusunu Başlat")
+            self.server_label.config(text="Yayın: kapalı")
+            return
+        try:
+            self.server = EMGStreamServer(port=int(self.server_port_entry.get()))
+            self.server.start()
+            self.server_btn.config(text="Yayın Sunucusunu Durdur")
+        except Exception as e:
+            print("Yayın sunucusu başlatılamadı:", e)
+            self.server = None
+
+    def publish_emg(self, server, seq, forearm, wrist, gesture):
+        """Bloğu yayın sunucusunun tüm abonelerine gönder (beklemeden)"""
+        if self.protocol == "JSON":
+            data = emg_protocol.encode_json(forearm, wrist)
+        else:
+            data = b"".join(emg_protocol.encode_frame(
+                seq, forearm, wrist, gesture=mod_gesture_emg.GESTURE_TO_INDEX.get(gesture, -1),
+                compress=self.protocol == "Binary + zlib"))
+        server.publish(data)
+
     def toggle_socket(self):
         self.send_socket = not self.send_socket
         if self.send_socket:
@@ -73,6 +153,7 @@ class EMGGestureUI:
                 port = int(self.port_entry.get())
                 self.socket_client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 self.socket_client.connect((ip, port))
+                self.tx_seq = 0
                 self.toggle_btn.config(text="Canlı Socket Gönderimini Durdur")
             except Exception as e:
                 print("Socket bağlantı hatası:", e)
@@ -86,40 +167,98 @@ class EMGGestureUI:
             self.toggle_btn.config(text="Canlı Socket Gönderimini Başlat")
 
     def predict_loop(self):
+        interval = mod_gesture.PREDICT_INTERVAL if self.fast_model else 0.5
+        last_seen = None
         while self.running:
             try:
-                if self.model and mod_gesture.current_landmarks:
-                    flat = np.array(mod_gesture.current_landmarks).flatten().reshape(1, -1)
-                    pred = self.model.predict(flat)[0]
-                    self.current_pred = pred
-                    self.parent.after(0, lambda: self.gesture_label.config(text=f"Gesture Tahmini: {pred}"))
-                time.sleep(0.5)
+                landmarks = mod_gesture.current_landmarks
+                # Yalnızca yeni gelen kare sınıflandırılır
+                if self.model and landmarks and landmarks is not last_seen:
+                    last_seen = landmarks
+                    flat = landmarks.flat_xy.reshape(1, -1)
+                    if self.fast_model:
+                        pred, proba = self.fast_model.predict_one(flat)
+                        self.prefetcher.update(pred, dict(zip(self.fast_model.classes_, proba.tolist())))
+                    elif hasattr(self.model, "predict_proba"):
+                        proba = self.model.predict_proba(flat)[0]
+                        pred = self.model.classes_[np.argmax(proba)]
+                        self.prefetcher.update(pred, dict(zip(self.model.classes_, proba)))
+                    else:
+                        pred = self.model.predict(flat)[0]
+                        self.prefetcher.update(pred)
+                    if pred != self.current_pred:
+                        self.current_pred = pred
+                        self.parent.after(0, lambda: self.gesture_label.config(text=f"Gesture Tahmini: {pred}"))
+                time.sleep(interval)
             except Exception as e:
                 print("Tahmin hatası:", e)
                 break
 
     def emg_update_loop(self):
+        self.stream = mod_gesture_emg.EMGReplayStream(lambda: self.current_pred, loader=self.prefetcher.get)
+        plot_forearm = np.zeros((PLOT_SAMPLES, mod_gesture_emg.FORARM_CHANNELS), dtype=np.float32)
+        plot_wrist = np.zeros((PLOT_SAMPLES, mod_gesture_emg.WRIST_CHANNELS), dtype=np.float32)
+        last_plot = 0
+
+        last_error = None
         while self.running:
-            gesture = self.current_pred
-            forearm, wrist, err = mod_gesture_emg.load_random_emg(gesture)
-            if forearm is not None:
-                self.parent.after(0, lambda: self.plot_signals(forearm[:1024], wrist[:1024]))
-                self.parent.after(0, lambda: self.count_label.config(text=f"Örnek sayısı: {len(forearm)}"))
+            try:
+                chunk = next(self.stream)
+                if not self.running:
+                    break
+
+                chunk_forearm, chunk_wrist = chunk.forearm, chunk.wrist
+                if self.filter_enabled:
+                    chunk_forearm = self.forearm_filter.process(chunk_forearm)
+                    chunk_wrist = self.wrist_filter.process(chunk_wrist)
+
+                # Son PLOT_SAMPLES örneği tutan kayan pencere
+                n = min(len(chunk_forearm), PLOT_SAMPLES)
+                plot_forearm[:-n] = plot_forearm[n:]
+                plot_forearm[-n:] = chunk_forearm[-n:]
+                plot_wrist[:-n] = plot_wrist[n:]
+                plot_wrist[-n:] = chunk_wrist[-n:]
+
+                now = time.time()
+                if now - last_plot >= PLOT_INTERVAL:
+                    last_plot = now
+                    forearm, wrist = plot_forearm.copy(), plot_wrist.copy()
+                    hit_rate = self.prefetcher.stats()["hit_rate"]
+                    err = chunk.error
+                    if chunk.gesture not in mod_gesture_emg.GESTURE_TO_INDEX:
+                        self.parent.after(0, lambda: self.plot_message("Tanımsız hareket"))
+                    elif err:
+                        self.parent.after(0, lambda: self.plot_message(err))
+                    else:
+                        self.parent.after(0, lambda: self.plot_signals(forearm, wrist))
+                    self.parent.after(0, lambda: self.count_label.config(
+                        text=f"Parça: {chunk.seq} | Ön yükleme isabeti: %{hit_rate * 100:.0f}"))
+                    server = self.server
+                    if server and server.running:
+                        st = server.stats()
+                        self.parent.after(0, lambda: self.server_label.config(
+                            text=f"Yayın: {st['clients']} istemci | atılan çerçeve: {st['dropped']}"))
+
+                server = self.server
+                if server and server.running and server.client_count:
+                    self.publish_emg(server, chunk.seq, chunk_forearm, chunk_wrist, chunk.gesture)
 
                 if self.send_socket and self.socket_client:
                     try:
-                        payload = json.dumps({
-                            "forearm": forearm[:512, :].tolist(),
-                            "wrist": wrist[:512, :].tolist()
-                        }) + "\n"
-                        self.socket_client.sendall(payload.encode('utf-8'))
+                        self.send_emg(chunk_forearm, chunk_wrist, chunk.gesture)
                     except Exception as e:
                         print("Gönderim hatası:", e)
                         self.parent.after(0, self.toggle_socket)
-            else:
-                self.parent.after(0, lambda: self.plot_message(err))
-
-            time.sleep(1)
+            except StopIteration:
+                break
+            except Exception as e:
+                # Tek parçadaki hata (filtre, çizim, yayın) akışı durdurmaz; gösterilip sonraki parçaya geçilir
+                msg = f"Akış hatası: {e}"
+                if msg != last_error:
+                    print("EMG", msg)
+                    last_error = msg
+                self.parent.after(0, lambda: self.plot_message(msg))
+                time.sleep(self.stream.chunk_size / self.stream.fs)
 
     def send_manual_emg(self):
         try:
@@ -131,11 +270,8 @@ class EMGGestureUI:
             if forearm is not None:
                 self.parent.after(0, lambda: self.plot_signals(forearm[:1024], wrist[:1024]))
                 if self.send_socket and self.socket_client:
-                    payload = json.dumps({
-                        "forearm": forearm[:512, :].tolist(),
-                        "wrist": wrist[:512, :].tolist()
-                    }) + "\n"
-                    self.socket_client.sendall(payload.encode('utf-8'))
+                    gesture = next((k for k, v in mod_gesture_emg.GESTURE_TO_INDEX.items() if v == index), None)
+                    self.send_emg(forearm[:512, :], wrist[:512, :], gesture)
             else:
                 self.parent.after(0, lambda: self.plot_message(err))
         except Exception as e:
@@ -168,6 +304,11 @@ class EMGGestureUI:
 
     def exit_and_save(self):
         self.running = False
+        if hasattr(self, "stream"):
+            self.stream.stop()
+        self.prefetcher.close()
+        if self.server:
+            self.server.stop()
         if self.socket_client:
             self.socket_client.close()
         time.sleep(0.1)
@@ -15,7 +15,7 @@ class App:
         self.root.title("El Modu Seçici")
         self.root.geometry("820x520")
 
-        self.video = VideoProcessor()
+        self.video = VideoProcessor(pipelined=True, detector_process=True, adaptive_rate=True)
         self.current_mode = None
 
         self.mode_var = tk.StringVar(value="Finger Percentage")
@@ -88,14 +88,17 @@ class App:
         while self.running:
             frame, landmarks = self.video.get_frame()
             if frame is not None:
-                if self.current_mode and hasattr(self.current_mode, 'update_from_landmarks') and landmarks:
+                hands = self.video.hands
+                if self.current_mode and hands is not None and len(hands) > 1 and \
+                        hasattr(self.current_mode, 'update_from_hands'):
+                    self.current_mode.update_from_hands(hands)
+                elif self.current_mode and hasattr(self.current_mode, 'update_from_landmarks') and landmarks:
                     self.current_mode.update_from_landmarks(landmarks)
 
                 img = Image.fromarray(frame)
                 imgtk = ImageTk.PhotoImage(image=img)
                 self.video_label.imgtk = imgtk
                 self.video_label.config(image=imgtk)
-            time.sleep(0.03)
 
     def on_closing(self):
         self.running = False
@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import deque, namedtuple
+import cv2
+
+CapturedFrame = namedtuple("CapturedFrame", ["frame_id", "timestamp", "frame"])
+
+# İstenen mod desteklenmezse denenecek (genişlik, yükseklik, fps) modları; çalışma boyutuna yakınlığa göre sıralanır
+FALLBACK_MODES = [(640, 480, 30), (800, 600, 30), (1280, 720, 30)]
+DRIVER_BUFFER_SIZE = 1  # Sürücüde bekleyen kare sayısı (gecikmeyi sınırlar)
+
+
+def mode_rank(size, working_size):
+    """Sıralama anahtarı: çalışma boyutunu karşılayan en küçük boyut önce, sonra karşılamayanların en büyüğü"""
+    width, height = size[:2]
+    covers = width >= working_size[0] and height >= working_size[1]
+    return (not covers, width * height if covers else -width * height)
+
+
+class CameraStream:
+    """Kameradan sürekli okuyan ve en yeni kareleri halka tamponda tutan yakalama iş parçacığı
+
+    Tüketici her zaman en yeni kareyi alır; arada okunmadan geçen kareler
+    atılır ve dropped sayacında tutulur. İşleme hiçbir zaman kamerayı beklemez.
+    """
+
+    def __init__(self, camera_index=0, buffer_size=2, width=640, height=480, fps=30, fourcc="MJPG",
+                 driver_buffer_size=DRIVER_BUFFER_SIZE, fallback_modes=FALLBACK_MODES, working_size=None):
+        self.cap = cv2.VideoCapture(camera_index)
+        self.negotiated = self._negotiate(width, height, fps, fourcc, driver_buffer_size, fallback_modes,
+                                          working_size or (width, height))
+        self._ring = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self.frame_id = 0
+        self.last_read_id = 0
+        self.dropped = 0
+        self.read_failures = 0
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def _set_mode(self, width, height, fps):
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        ret, frame = self.cap.read()
+        return frame.shape[:2] if ret else None
+
+    def _negotiate(self, width, height, fps, fourcc, driver_buffer_size, fallback_modes, working_size):
+        """Kamerayı çalışma çözünürlüğüne yakın bir moda ayarla ve gerçekte alınanı raporla"""
+        if not self.cap.isOpened():
+            return {}
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if driver_buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, driver_buffer_size)
+
+        fallbacks = sorted((m for m in fallback_modes if m != (width, height, fps)),
+                           key=lambda m: mode_rank(m, working_size))
+        shape = best = None
+        for mode in [(width, height, fps)] + fallbacks:
+            # Bazı sürücüler ayarı kabul edip farklı boyutta kare verir; bir kare okunarak doğrulanır
+            shape = self._set_mode(*mode)
+            if shape == (mode[1], mode[0]):
+                break
+            print(f"⚠️ Kamera modu desteklenmiyor: {mode[0]}x{mode[1]}@{mode[2]}")
+            if shape is not None and (best is None or mode_rank(shape[::-1], working_size) <
+                                      mode_rank(best[1][::-1], working_size)):
+                best = (mode, shape)
+        else:
+            if best is not None:
+                # Hiçbir mod tam uymadı: son denenen yerine kare veren en uygun mod yeniden uygulanır
+                shape = self._set_mode(*best[0]) or best[1]
+
+        if shape is None and fourcc:
+            # Hiç kare alınamadıysa piksel formatı desteklenmiyor olabilir; varsayılan formatla tekrar dene
+            print(f"⚠️ {fourcc} formatında kare alınamadı, varsayılan formata dönülüyor.")
+            self.cap.set(cv2.CAP_PROP_FOURCC, 0)
+            return self._negotiate(width, height, fps, None, driver_buffer_size, fallback_modes, working_size)
+
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        negotiated = {
+            "width": shape[1] if shape else int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": shape[0] if shape else int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "fourcc": "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)) if code else None,
+            "buffer_size": self.cap.get(cv2.CAP_PROP_BUFFERSIZE),
+            "requested": (width, height, fps, fourcc),
+        }
+        print(f"📷 Kamera modu: {negotiated['width']}x{negotiated['height']}@{negotiated['fps']:.0f} "
+              f"{negotiated['fourcc'] or ''}")
+        return negotiated
+
+    def _capture_loop(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            timestamp = time.time()
+            with self._cond:
+                self.frame_id += 1
+                self._ring.append(CapturedFrame(self.frame_id, timestamp, frame))
+                self._cond.notify_all()
+
+    def read(self, newer_than=None, timeout=None):
+        """En yeni kareyi döndür; newer_than verilirse daha yeni kare gelene kadar bekle"""
+        with self._cond:
+            if newer_than is not None:
+                self._cond.wait_for(lambda: self.frame_id > newer_than or not self.running, timeout)
+            if not self._ring or (newer_than is not None and self.frame_id <= newer_than):
+                return None
+            latest = self._ring[-1]
+            if latest.frame_id > self.last_read_id:
+                self.dropped += max(0, latest.frame_id - self.last_read_id - 1)
+                self.last_read_id = latest.frame_id
+            return latest
+
+    def stats(self):
+        return {
+            "captured": self.frame_id,
+            "dropped": self.dropped,
+            "read_failures": self.read_failures,
+        }
+
+    def release(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=1)
+        self.cap.release()
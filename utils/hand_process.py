@@ -0,0 +1,166 @@
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from utils.mediapipe import first_hand_landmarks, NO_HANDS
+
+SHM_SLOTS = 2  # Paylaşılan bellekteki kare yuvası sayısı
+STARTUP_TIMEOUT = 30.0  # Soğuk açılış (süreç, içe aktarmalar, Hands) için beklenen en uzun süre (sn)
+RESPONSE_TIMEOUT = 2.0  # Hazır süreç bir kareye bu süre içinde yanıt vermezse yeniden başlatılır (sn)
+RESTART_BACKOFF = 1.0  # Başarısız yeniden başlatmadan sonraki ilk bekleme; her hatada ikiye katlanır (sn)
+MAX_RESTART_BACKOFF = 30.0  # Yeniden başlatma denemeleri arasındaki en uzun bekleme (sn)
+
+
+def _worker_main(conn, shm_name, detector_kwargs):
+    """Ayrı süreçte çalışan MediaPipe döngüsü; kareleri paylaşılan bellekten okur"""
+    from utils.mediapipe import HandDetector
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        detector = HandDetector(**detector_kwargs)
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        shm.close()
+        return
+    conn.send("ready")  # Ana süreç kare göndermeden önce bunu bekler
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            req_id, offset, shape = msg
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+            hands, handedness = detector.detect(frame)
+            del frame  # Paylaşılan belleğe referans kalmasın
+            conn.send((req_id, hands, handedness, detector.roi_stats()))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class ProcessHandDetector:
+    """HandDetector ile aynı arayüzde, çıkarımı ayrı bir süreçte yapan el algılayıcı
+
+    Her kare paylaşılan bellek yuvasına bir kez kopyalanır (pickle edilmez), süreçten
+    yalnızca landmark koordinatları döner. Süreç çökerse veya yanıt vermezse yeniden
+    başlatılır; başarısız denemeler arasında giderek artan süre beklenir.
+    """
+
+    def __init__(self, frame_shape=(380, 380, 3), **detector_kwargs):
+        self.detector_kwargs = detector_kwargs
+        self.frame_shape = tuple(frame_shape)
+        self.restarts = 0
+        self._shm = None
+        self._proc = None
+        self._conn = None
+        self._req_id = 0
+        self._roi_stats = {}
+        self._backoff = RESTART_BACKOFF
+        self._retry_at = 0.0
+        self._ctx = multiprocessing.get_context("spawn")
+        try:
+            self.start()
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def slot_bytes(self):
+        return int(np.prod(self.frame_shape))
+
+    def start(self):
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * SHM_SLOTS)
+        self._spawn()
+
+    def _spawn(self):
+        self._conn, child_conn = self._ctx.Pipe()
+        self._proc = self._ctx.Process(target=_worker_main, daemon=True,
+                                       args=(child_conn, self._shm.name, self.detector_kwargs))
+        self._proc.start()
+        child_conn.close()
+        # Soğuk açılış kare zaman aşımına sayılmaz; süreç hazır olduğunu bildirene kadar beklenir
+        try:
+            ready = self._conn.recv() if self._conn.poll(STARTUP_TIMEOUT) else "zaman aşımı"
+        except (EOFError, OSError):
+            ready = "süreç kapandı"
+        if ready != "ready":
+            self._kill()
+            raise RuntimeError(f"süreç hazır olmadı ({ready})")
+
+    def _kill(self):
+        if self._proc is not None and self._proc.pid is not None:  # Hiç başlamamış süreç beklenemez
+            if self._proc.is_alive():
+                self._proc.terminate()
+            self._proc.join(timeout=1)
+        if self._conn is not None:
+            self._conn.close()
+        self._proc = self._conn = None
+
+    def restart(self):
+        """Süreci yeniden başlat; bekleme süresi dolmadıysa denemeden False döndür"""
+        if time.monotonic() < self._retry_at:
+            return False
+        print("🔄 El algılama süreci yeniden başlatılıyor...")
+        self._kill()
+        self.restarts += 1
+        try:
+            self._spawn()
+        except Exception as e:
+            print("❌ El algılama süreci başlatılamadı:", e)
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, MAX_RESTART_BACKOFF)
+            return False
+        self._backoff = RESTART_BACKOFF
+        return True
+
+    def close(self):
+        if self._conn is not None and self._proc is not None and self._proc.is_alive():
+            try:
+                self._conn.send(None)
+                self._proc.join(timeout=1)
+            except (OSError, BrokenPipeError):
+                pass
+        try:
+            self._kill()
+        finally:
+            # Süreç kapatılamasa da paylaşılan bellek serbest bırakılır
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+
+    def detect(self, frame):
+        """Karedeki eller: normalize (H, 21, 3) dizi ve el yönü etiketleri"""
+        if frame.shape != self.frame_shape:
+            # Kare boyutu değişti: yuvaları yeni boyuta göre yeniden ayır, süreç aşağıda başlatılır
+            self.close()
+            self.frame_shape = frame.shape
+            self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * SHM_SLOTS)
+        if self._proc is None or not self._proc.is_alive():
+            if not self.restart():
+                return NO_HANDS, []
+
+        self._req_id += 1
+        slot = self._req_id % SHM_SLOTS
+        offset = slot * self.slot_bytes
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf, offset=offset)[:] = frame
+        try:
+            self._conn.send((self._req_id, offset, frame.shape))
+            # Eski isteklerin gecikmiş yanıtları atlanır
+            while self._conn.poll(RESPONSE_TIMEOUT):
+                req_id, hands, handedness, self._roi_stats = self._conn.recv()
+                if req_id == self._req_id:
+                    return hands, handedness
+        except (EOFError, OSError, BrokenPipeError):
+            pass
+        self.restart()
+        return NO_HANDS, []
+
+    def roi_stats(self):
+        """Süreçteki algılayıcının son bildirdiği kırpma isabet sayaçları"""
+        return dict(self._roi_stats)
+
+    def process_with_landmarks(self, frame, frame_id=0, timestamp=None):
+        hands, handedness = self.detect(frame)
+        return first_hand_landmarks(frame, hands, handedness, frame_id, timestamp)
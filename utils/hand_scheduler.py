@@ -0,0 +1,111 @@
+import time
+import numpy as np
+from utils.mediapipe import first_hand_landmarks, NO_HANDS
+
+MIN_DETECTION_RATE = 8.0  # El sabitken saniyedeki en az algılama sayısı
+MAX_DETECTION_RATE = 30.0  # Hızlı harekette saniyedeki en çok algılama sayısı
+MAX_PREDICTION_ERROR = 0.01  # Algılamalar arası izin verilen tahmini kayma (kareye göre normalize)
+MAX_EXTRAPOLATION = 0.15  # Hızla ileri tahminin yapılabileceği en uzun süre (sn)
+MOTION_SMOOTHING = 0.5  # Hız tahmininin üstel ortalama katsayısı
+
+
+class AdaptiveHandDetector:
+    """El algılayıcıyı hareket miktarına göre seyrek çalıştıran zamanlayıcı
+
+    İki algılama arasındaki landmark hızından bir sonraki algılamanın ne zaman
+    gerektiği hesaplanır: el sabitken min_rate'e, hızlı harekette max_rate'e kadar
+    çıkar. Aradaki karelerde landmarklar hızla ileri tahmin edilir veya tutulur.
+    HandDetector / ProcessHandDetector ile aynı arayüzü sunar.
+    """
+
+    def __init__(self, detector, min_rate=MIN_DETECTION_RATE, max_rate=MAX_DETECTION_RATE,
+                 max_error=MAX_PREDICTION_ERROR, extrapolate=True, max_extrapolation=MAX_EXTRAPOLATION):
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("min_rate 0'dan büyük ve max_rate'ten küçük olmalı")
+        self.detector = detector
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_error = max_error
+        self.extrapolate = extrapolate
+        self.max_extrapolation = max_extrapolation
+
+        self._hands = None  # Son algılanan eller (H, 21, 3)
+        self._velocity = None  # Landmark hızları (H, 21, 3) / sn
+        self._handedness = []
+        self._last_detection = 0.0
+        self._next_detection = 0.0
+        self.speed = 0.0  # En hızlı landmarkın hızı (normalize / sn)
+        self.detections = 0
+        self.predicted = 0
+
+    def reset(self):
+        self._hands = self._velocity = None
+        self._next_detection = 0.0
+        self.speed = 0.0
+
+    def _interval(self):
+        """Tahmini kaymanın max_error'ı aşmayacağı algılama aralığı"""
+        if self._hands is None:
+            return 1.0 / self.min_rate  # El yokken yeniden yakalama için en düşük hızda dene
+        interval = self.max_error / self.speed if self.speed > 0 else float("inf")
+        return min(max(interval, 1.0 / self.max_rate), 1.0 / self.min_rate)
+
+    def _update(self, hands, now):
+        if not len(hands):
+            self.reset()
+            return
+        dt = now - self._last_detection
+        if self._hands is not None and self._hands.shape == hands.shape and dt > 0:
+            velocity = (hands - self._hands) / dt
+            if self._velocity is not None:
+                velocity = MOTION_SMOOTHING * self._velocity + (1 - MOTION_SMOOTHING) * velocity
+            self._velocity = velocity
+            self.speed = float(np.abs(velocity[..., :2]).max())
+        else:
+            # El sayısı değişti veya yeni yakalandı: hız bilinmiyor, hızlı takip et
+            self._velocity = None
+            self.speed = self.max_error * self.max_rate
+        self._hands = hands
+        self._last_detection = now
+
+    def detect(self, frame):
+        """detect ile aynı biçim; gerekmedikçe algılayıcıyı çalıştırmadan tahmin döndürür"""
+        now = time.time()
+        if now >= self._next_detection:
+            self.detections += 1
+            hands, self._handedness = self.detector.detect(frame)
+            self._update(hands, now)
+            self._next_detection = now + self._interval()
+            return hands, self._handedness
+
+        self.predicted += 1
+        if self._hands is None:
+            return NO_HANDS, []
+        hands = self._hands
+        if self.extrapolate and self._velocity is not None:
+            dt = min(now - self._last_detection, self.max_extrapolation)
+            hands = hands + self._velocity * dt
+        return hands, self._handedness
+
+    def stats(self):
+        total = self.detections + self.predicted
+        return {
+            "detections": self.detections,
+            "predicted": self.predicted,
+            "detection_ratio": self.detections / total if total else 0.0,
+            "interval_ms": self._interval() * 1000,
+            "speed": self.speed,
+        }
+
+    def roi_stats(self):
+        stats = self.detector.roi_stats() if hasattr(self.detector, "roi_stats") else {}
+        stats.update(self.stats())
+        return stats
+
+    def process_with_landmarks(self, frame, frame_id=0, timestamp=None):
+        hands, handedness = self.detect(frame)
+        return first_hand_landmarks(frame, hands, handedness, frame_id, timestamp)
+
+    def close(self):
+        if hasattr(self.detector, "close"):
+            self.detector.close()
@@ -0,0 +1,128 @@
+import numpy as np
+
+NUM_LANDMARKS = 21  # MediaPipe el landmark sayısı
+
+
+def get_bounding_box(landmarks, margin=20):
+    coords = np.asarray(landmarks)[:, :2]  # LandmarkFrame için kopyasız (21, 2) görünüm
+    x_min = int(np.min(coords[:, 0])) - margin
+    y_min = int(np.min(coords[:, 1])) - margin
+    x_max = int(np.max(coords[:, 0])) + margin
+    y_max = int(np.max(coords[:, 1])) + margin
+    return x_min, y_min, x_max, y_max
+
+
+def order_hands(hands, handedness):
+    """Elleri el yönü etiketine göre sırala; iki el kareler boyunca aynı indekste kalır"""
+    labels = list(handedness) + [None] * (len(hands) - len(handedness))
+    if len(hands) < 2:
+        return hands, labels
+    order = sorted(range(len(hands)), key=lambda i: labels[i] or "")
+    return hands[order], [labels[i] for i in order]
+
+
+class LandmarkFrame:
+    """Tek bir elin salt okunur landmarkları ve ait olduğu kare bilgisi
+
+    points: (21, 3) float32 dizi; x, y kare piksel koordinatı, z ise MediaPipe
+    derinliğinin kare genişliğiyle ölçeklenmiş hali (x ile aynı birimde).
+    Eski (x, y) listesiyle uyumludur: len, indeksleme ve np.asarray 2B noktaları verir.
+    """
+    __slots__ = ("points", "frame_id", "timestamp", "handedness", "_flat_xy")
+
+    def __init__(self, points, frame_id=0, timestamp=None, handedness=None):
+        points = np.asarray(points, dtype=np.float32)
+        if points.shape != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Landmark dizisi (21, 3) olmalı, gelen: {points.shape}")
+        points.flags.writeable = False
+        self.points = points
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.handedness = handedness
+        self._flat_xy = None
+
+    @classmethod
+    def from_normalized(cls, hand, width, height, frame_id=0, timestamp=None, handedness=None):
+        """MediaPipe'ın normalize (21, 3) koordinatlarından piksel koordinatlı kare oluştur"""
+        points = np.array(hand, dtype=np.float32)
+        points *= np.array([width, height, width], dtype=np.float32)
+        return cls(points, frame_id, timestamp, handedness)
+
+    @property
+    def xy(self):
+        """(21, 2) piksel koordinatları (kopyasız görünüm)"""
+        return self.points[:, :2]
+
+    @property
+    def flat_xy(self):
+        """Poz modelinin beklediği 42 elemanlı [x0, y0, x1, y1, ...] vektörü (bir kez hesaplanır)"""
+        if self._flat_xy is None:
+            flat = self.points[:, :2].flatten()
+            flat.flags.writeable = False
+            self._flat_xy = flat
+        return self._flat_xy
+
+    def __len__(self):
+        return NUM_LANDMARKS
+
+    def __getitem__(self, index):
+        return self.points[index, :2]
+
+    def __iter__(self):
+        return iter(self.points[:, :2])
+
+    def __array__(self, dtype=None, copy=None):
+        xy = self.points[:, :2]
+        return xy.astype(dtype) if dtype is not None else xy
+
+    def __repr__(self):
+        return f"LandmarkFrame(frame_id={self.frame_id}, handedness={self.handedness!r})"
+
+
+class HandsFrame:
+    """Bir karedeki tüm ellerin salt okunur landmarkları (çoklu el modu)
+
+    points: (H, 21, 3) float32 dizi (LandmarkFrame ile aynı birimler), handedness: el başına etiket.
+    """
+    __slots__ = ("points", "frame_id", "timestamp", "handedness", "_flat_xy")
+
+    def __init__(self, points, frame_id=0, timestamp=None, handedness=()):
+        points = np.asarray(points, dtype=np.float32)
+        if points.ndim != 3 or points.shape[1:] != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Landmark dizisi (H, 21, 3) olmalı, gelen: {points.shape}")
+        points.flags.writeable = False
+        self.points = points
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.handedness = tuple(handedness)
+        self._flat_xy = None
+
+    @classmethod
+    def from_normalized(cls, hands, width, height, frame_id=0, timestamp=None, handedness=()):
+        points = np.array(hands, dtype=np.float32)
+        points *= np.array([width, height, width], dtype=np.float32)
+        return cls(points, frame_id, timestamp, handedness)
+
+    @property
+    def xy(self):
+        """(H, 21, 2) piksel koordinatları (kopyasız görünüm)"""
+        return self.points[..., :2]
+
+    @property
+    def flat_xy(self):
+        """Poz modeline tek çağrıda verilecek (H, 42) özellik matrisi"""
+        if self._flat_xy is None:
+            flat = self.points[..., :2].reshape(len(self.points), -1)
+            flat.flags.writeable = False
+            self._flat_xy = flat
+        return self._flat_xy
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, index):
+        """index. el LandmarkFrame olarak (veri kopyalanmaz)"""
+        return LandmarkFrame(self.points[index], self.frame_id, self.timestamp, self.handedness[index])
+
+    def __repr__(self):
+        return f"HandsFrame(frame_id={self.frame_id}, handedness={self.handedness!r})"
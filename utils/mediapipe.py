@@ -1,8 +1,47 @@
 import cv2
+import numpy as np
 import mediapipe as mp
+from utils.landmarks import LandmarkFrame, HandsFrame, NUM_LANDMARKS, get_bounding_box
+
+ROI_INPUT_SIZE = 256  # Takip modunda kırpılan bölgenin ölçeklendiği sabit boyut
+ROI_EXPAND = 1.6  # Önceki kare kutusunun büyütme katsayısı
+ROI_MIN_SIZE = 16  # Bundan küçük kırpmalarda tam kare algılamaya dönülür
+ROI_SEARCH_INTERVAL = 15  # Takipte el sayısı max_hands'ten azken tam karede yeni el arama aralığı (kare)
+ROI_MERGE_DISTANCE = 0.1  # Merkezleri bundan yakın eller aynı el sayılır (normalize koordinat)
+NO_HANDS = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+HAND_CONNECTIONS = np.array(sorted(mp.solutions.hands.HAND_CONNECTIONS))  # (E, 2) bağlantı indeksleri
+
+
+def _results_to_array(results):
+    """MediaPipe sonucunu (H, 21, 3) normalize dizi ve el yönü etiketlerine dönüştür"""
+    if not results.multi_hand_landmarks:
+        return NO_HANDS, []
+    hands = np.empty((len(results.multi_hand_landmarks), NUM_LANDMARKS, 3), dtype=np.float32)
+    for h, hand_landmarks in enumerate(results.multi_hand_landmarks):
+        for i, p in enumerate(hand_landmarks.landmark):
+            hands[h, i] = p.x, p.y, p.z
+    handedness = [c.classification[0].label for c in results.multi_handedness or []]
+    return hands, handedness
+
+
+def _merge_hands(hands, handedness, extra, extra_handedness, max_hands):
+    """Takip edilen ellere, tam karede bulunup bunlarla çakışmayan elleri ekle"""
+    centers = hands[..., :2].mean(axis=1)
+    keep = []
+    for i, hand in enumerate(extra):
+        if len(hands) + len(keep) >= max_hands:
+            break
+        if np.linalg.norm(centers - hand[:, :2].mean(axis=0), axis=1).min() > ROI_MERGE_DISTANCE:
+            keep.append(i)
+    if not keep:
+        return hands, handedness
+    labels = list(handedness) + [extra_handedness[i] for i in keep if i < len(extra_handedness)]
+    return np.concatenate([hands, extra[keep]]), labels
+
 
 class HandDetector:
-    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7):
+    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                 roi_tracking=False, roi_size=ROI_INPUT_SIZE, roi_expand=ROI_EXPAND):
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
@@ -11,17 +50,128 @@ class HandDetector:
             min_tracking_confidence=tracking_confidence
         )
         self.mp_draw = mp.solutions.drawing_utils
+        self.max_hands = max_hands
+
+        # Takip modu: önceki karedeki el(ler)i kapsayan kutunun çevresi küçük sabit boyutta işlenir
+        self.roi_tracking = roi_tracking
+        self.roi_size = roi_size
+        self.roi_expand = roi_expand
+        self.roi_hands = self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_hands,
+            min_detection_confidence=detection_confidence,
+            min_tracking_confidence=tracking_confidence
+        ) if roi_tracking else None
+        self._prev_box = None
+        self._prev_count = 0
+        self._frames_since_full = 0
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_frame_runs = 0
+
+    def _roi_box(self, w, h):
+        """Önceki kutunun merkezinde kare bölge: sol üst köşe ve kenar uzunluğu (kare dışına taşabilir)"""
+        x1, y1, x2, y2 = self._prev_box
+        # Kare dışına taşan landmarklarla kutu her karede büyümesin diye kenar kare boyutuyla sınırlanır
+        side = min(int(max(x2 - x1, y2 - y1) * self.roi_expand), max(w, h))
+        if side < ROI_MIN_SIZE:
+            return None
+        return int((x1 + x2 - side) / 2), int((y1 + y2 - side) / 2), side
+
+    def _detect_roi(self, frame):
+        h, w = frame.shape[:2]
+        box = self._roi_box(w, h)
+        if box is None:
+            return NO_HANDS, []
+        x0, y0, side = box
+        x1, y1 = max(0, x0), max(0, y0)
+        x2, y2 = min(w, x0 + side), min(h, y0 + side)
+        if x2 - x1 < ROI_MIN_SIZE or y2 - y1 < ROI_MIN_SIZE:
+            return NO_HANDS, []
+        # Kare dışına taşan kısım doldurulur: kırpma her zaman kare kalır, kenardaki el bozulmaz
+        crop = cv2.copyMakeBorder(frame[y1:y2, x1:x2], y1 - y0, y0 + side - y2, x1 - x0, x0 + side - x2,
+                                  cv2.BORDER_CONSTANT, value=0)
+        crop = cv2.resize(crop, (self.roi_size, self.roi_size), interpolation=cv2.INTER_AREA)
+        hands, handedness = _results_to_array(self.roi_hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)))
+        # Kırpma koordinatlarını tam kareye normalize koordinatlara geri taşı
+        hands *= np.array([side / w, side / h, side / w], dtype=np.float32)
+        hands[..., 0] += x0 / w
+        hands[..., 1] += y0 / h
+        return hands, handedness
+
+    def detect(self, frame):
+        """Karedeki eller: tam kareye göre normalize (H, 21, 3) dizi ve el yönü etiketleri"""
+        hands, handedness = NO_HANDS, []
+        if self.roi_tracking and self._prev_box is not None:
+            hands, handedness = self._detect_roi(frame)
+            # Önceki karedeki ellerden biri kırpmada bulunamadıysa tam kareye dönülür
+            if len(hands) >= self._prev_count:
+                self.roi_hits += 1
+            else:
+                self.roi_misses += 1
+                hands, handedness = NO_HANDS, []
+
+        if not len(hands):
+            self.full_frame_runs += 1
+            self._frames_since_full = 0
+            hands, handedness = _results_to_array(self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+        elif self.roi_tracking and len(hands) < self.max_hands:
+            # Kırpmanın dışında yeni bir el belirmiş olabilir: aralıklarla tam karede aranır
+            self._frames_since_full += 1
+            if self._frames_since_full >= ROI_SEARCH_INTERVAL:
+                self._frames_since_full = 0
+                self.full_frame_runs += 1
+                full = _results_to_array(self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+                hands, handedness = _merge_hands(hands, handedness, *full, self.max_hands)
+
+        if self.roi_tracking:
+            h, w = frame.shape[:2]
+            # Birden çok elde kutu tüm elleri kapsar
+            self._prev_box = get_bounding_box(hands[..., :2].reshape(-1, 2) * (w, h), margin=0) if len(hands) else None
+            self._prev_count = len(hands)
+        return hands, handedness
+
+    def roi_stats(self):
+        attempts = self.roi_hits + self.roi_misses
+        return {
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "full_frame_runs": self.full_frame_runs,
+            "roi_hit_rate": self.roi_hits / attempts if attempts else 0.0,
+        }
+
+    def process_with_landmarks(self, frame, frame_id=0, timestamp=None):
+        hands, handedness = self.detect(frame)
+        return first_hand_landmarks(frame, hands, handedness, frame_id, timestamp)
+
+
+def first_hand_landmarks(frame, hands, handedness, frame_id=0, timestamp=None):
+    """İlk eli kare üzerine çiz ve LandmarkFrame olarak döndür (el yoksa None)"""
+    if not len(hands):
+        return frame, None
+    h, w = frame.shape[:2]
+    landmarks = LandmarkFrame.from_normalized(hands[0], w, h, frame_id, timestamp,
+                                              handedness[0] if handedness else None)
+    draw_landmarks(frame, landmarks.xy)
+    return frame, landmarks
+
 
-    def process_with_landmarks(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
-        landmarks = []
+def all_hands_landmarks(frame, hands, handedness, frame_id=0, timestamp=None):
+    """Tüm elleri tek seferde çiz ve HandsFrame olarak döndür (el yoksa None)"""
+    if not len(hands):
+        return frame, None
+    h, w = frame.shape[:2]
+    all_hands = HandsFrame.from_normalized(hands, w, h, frame_id, timestamp, handedness)
+    draw_landmarks(frame, all_hands.xy)
+    return frame, all_hands
 
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                h, w = frame.shape[:2]
-                landmarks = [(int(p.x * w), int(p.y * h)) for p in hand_landmarks.landmark]
-                break  # sadece ilk el
 
-        return frame, landmarks if landmarks else None
+def draw_landmarks(frame, landmarks, color=(0, 0, 255), line_color=(255, 255, 255)):
+    """Piksel koordinatlı (21, 2) veya (H, 21, 2) landmarkları MediaPipe olmadan (yalnızca OpenCV ile) çiz"""
+    pts = np.asarray(landmarks)[..., :2].astype(np.int32).reshape(-1, NUM_LANDMARKS, 2)
+    # Tüm ellerin bağlantıları tek polylines çağrısında: (H * E, 2, 2) doğru parçaları
+    segments = pts[:, HAND_CONNECTIONS].reshape(-1, 2, 2)
+    cv2.polylines(frame, list(segments), isClosed=False, color=line_color, thickness=2)
+    for pt in pts.reshape(-1, 2).tolist():
+        cv2.circle(frame, pt, 3, color, -1)
+    return frame
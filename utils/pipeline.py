@@ -0,0 +1,143 @@
+import time
+import threading
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"  # Kuyruk doluysa en eski öğe atılır (en taze kare işlenir)
+DROP_NEWEST = "drop_newest"  # Kuyruk doluysa yeni öğe atılır
+BLOCK = "block"  # Kuyruk doluysa üretici bekler
+TIMING_SMOOTHING = 0.9
+
+
+class StageQueue:
+    """Aşamalar arasında sınırlı, bırakma politikası ayarlanabilir kuyruk"""
+
+    def __init__(self, maxsize=2, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Bilinmeyen politika: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == BLOCK:
+                    self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed)
+                elif self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    self.dropped += 1
+                    return False
+            if self._closed:
+                return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class _Stage:
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.inq = None
+        self.outq = None
+        self.processed = 0
+        self.avg_ms = 0.0
+        self.thread = None
+
+    def record(self, start):
+        elapsed = (time.perf_counter() - start) * 1000
+        self.avg_ms = elapsed if not self.processed else TIMING_SMOOTHING * self.avg_ms + (1 - TIMING_SMOOTHING) * elapsed
+        self.processed += 1
+
+
+class Pipeline:
+    """Her aşaması kendi iş parçacığında çalışan, sınırlı kuyruklarla bağlı işlem hattı
+
+    source: girdi üreten fonksiyon (None dönerse atlanır)
+    stages: [(ad, fonksiyon), ...]; fonksiyon None dönerse öğe hattan düşer
+    policies: {aşama adı: politika} - o aşamanın giriş kuyruğu için; "output" çıkış kuyruğu içindir
+    GIL'i bırakan yerel kodlar (OpenCV, MediaPipe) farklı karelerde aynı anda çalışabilir.
+    """
+
+    def __init__(self, source, stages, queue_size=2, policies=None, source_name="capture"):
+        policies = policies or {}
+        self.stages = [_Stage(name, fn) for name, fn in [(source_name, source)] + list(stages)]
+        self.queues = []
+        # Her aşamanın giriş kuyruğu bir öncekinin çıkışıdır
+        for prev, stage in zip(self.stages, self.stages[1:]):
+            queue = StageQueue(queue_size, policies.get(stage.name, DROP_OLDEST))
+            prev.outq = stage.inq = queue
+            self.queues.append(queue)
+        self.output = StageQueue(queue_size, policies.get("output", DROP_OLDEST))
+        self.stages[-1].outq = self.output
+        self.running = False
+
+    def start(self):
+        self.running = True
+        for stage in self.stages:
+            stage.thread = threading.Thread(target=self._run_stage, args=(stage,), daemon=True,
+                                            name=f"pipeline-{stage.name}")
+            stage.thread.start()
+
+    def stop(self):
+        self.running = False
+        for q in self.queues + [self.output]:
+            q.close()
+        for stage in self.stages:
+            if stage.thread:
+                stage.thread.join(timeout=1)
+
+    def get(self, timeout=None):
+        return self.output.get(timeout)
+
+    def stats(self):
+        return {
+            stage.name: {
+                "processed": stage.processed,
+                "avg_ms": stage.avg_ms,
+                "dropped": stage.outq.dropped,
+                "queue": len(stage.outq),
+            }
+            for stage in self.stages
+        }
+
+    def _run_stage(self, stage):
+        while self.running:
+            if stage.inq is None:
+                item = None
+            else:
+                item = stage.inq.get(timeout=0.1)
+                if item is None:
+                    continue
+            start = time.perf_counter()
+            try:
+                result = stage.fn() if stage.inq is None else stage.fn(item)
+            except Exception as e:
+                print(f"❌ {stage.name} aşaması hatası:", e)
+                continue
+            if result is None:
+                continue
+            stage.record(start)
+            stage.outq.put(result)
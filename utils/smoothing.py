@@ -0,0 +1,51 @@
+import numpy as np
+
+MIN_CUTOFF = 1.0  # Durağan eldeki en düşük kesim frekansı (Hz); düşükse titreme azalır, gecikme artar
+BETA = 10.0  # Hızla kesim frekansının artış katsayısı (normalize koordinat / sn başına)
+D_CUTOFF = 1.0  # Hız tahmininin kesim frekansı (Hz)
+
+
+class OneEuroFilter:
+    """Tüm landmark koordinatlarına tek NumPy adımında uygulanan One-Euro filtresi
+
+    Her landmark için kesim frekansı hızına göre ayarlanır: el sabitken güçlü
+    yumuşatma (titreme yok), hızlı harekette yüksek kesim (gecikme yok).
+    Girdi (H, 21, 3) normalize dizidir; el kaybolursa veya sayısı değişirse durum sıfırlanır.
+    """
+
+    def __init__(self, min_cutoff=MIN_CUTOFF, beta=BETA, d_cutoff=D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None  # Son filtrelenmiş değerler
+        self._dx = None  # Filtrelenmiş hız
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, timestamp):
+        if not len(x):
+            self.reset()
+            return x
+        if self._x is None or self._x.shape != x.shape:
+            self._x = np.array(x, dtype=np.float32)
+            self._dx = np.zeros_like(self._x)
+            self._t = timestamp
+            return self._x.copy()
+        dt = timestamp - self._t
+        if dt <= 0:
+            return self._x.copy()
+
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        speed = np.linalg.norm(self._dx, axis=-1, keepdims=True)
+        alpha = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        self._x += alpha * (x - self._x)
+        self._t = timestamp
+        return self._x.copy()
@@ -1,77 +1,176 @@
+import time
 import cv2
 import numpy as np
-from utils.mediapipe import HandDetector
+from utils.mediapipe import HandDetector, all_hands_landmarks
+from utils.landmarks import order_hands
+from utils.hand_process import ProcessHandDetector
+from utils.hand_scheduler import AdaptiveHandDetector
+from utils.enhance import FrameEnhancer
+from utils.camera import CameraStream
+from utils.pipeline import Pipeline
+from utils.smoothing import OneEuroFilter
 from modules.mod_finger_percentage import FingerPercentageEstimator
 from modules import mod_gesture  # ✳️ El kutusu için
 
+WORKING_SIZE = (380, 380)  # İşleme ve gösterim çözünürlüğü (genişlik, yükseklik)
+PIPELINE_QUEUE_SIZE = 2  # Aşamalar arası kuyruk uzunluğu
+
+
+class FramePacket:
+    """Hat aşamaları arasında taşınan kare ve ara sonuçları"""
+    __slots__ = ("frame_id", "timestamp", "frame", "landmarks", "hands", "output")
+
+    def __init__(self, frame_id, timestamp, frame):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.frame = frame
+        self.landmarks = None  # İlk el (LandmarkFrame)
+        self.hands = None  # Tüm eller (HandsFrame)
+        self.output = None
+
+
 class VideoProcessor:
-    def __init__(self, camera_index=0):
-        self.cap = cv2.VideoCapture(camera_index)
+    def __init__(self, camera_index=0, capture_width=640, capture_height=480, capture_fps=30, fourcc="MJPG",
+                 pipelined=False, pipeline_policies=None, detector_process=False, roi_tracking=False,
+                 adaptive_rate=False, max_hands=1):
+        self.camera = CameraStream(camera_index, width=capture_width, height=capture_height,
+                                   fps=capture_fps, fourcc=fourcc, working_size=WORKING_SIZE)
+        self.frame_id = 0  # Son işlenen karenin kimliği
+        self.frame_timestamp = None  # Son işlenen karenin yakalanma zamanı
+        self.hands = None  # Son karedeki tüm eller (HandsFrame); çoklu el modunda kullanılır
+        self.max_hands = max_hands
+        self.latency_ms = 0.0  # Yakalama -> landmark gecikmesi (üstel ortalama)
         self.gamma = 1.0
         self.auto_gamma = False
         self.equalize_hist = False
-        self.hand_detector = HandDetector()
+        self.hand_detector = self._create_detector(detector_process, roi_tracking, max_hands)
+        if adaptive_rate:
+            # El sabitken algılama seyrekleşir, aradaki karelerde landmarklar tahmin edilir
+            self.hand_detector = AdaptiveHandDetector(self.hand_detector)
         self.draw_triangles = False
         self.show_bbox = False  # ✅ Yeni: sadece kutu çizimi kontrolü
+        self.smooth_landmarks = True  # Landmarklar One-Euro filtresinden geçirilir
+        self.smoother = OneEuroFilter()
         self.estimator = FingerPercentageEstimator()
+        self.enhancer = FrameEnhancer()
+        self._captured_id = 0
+
+        # Hat modunda her aşama kendi iş parçacığında çalışır; aksi halde get_frame seri işler
+        self.pipeline = None
+        if pipelined:
+            self.pipeline = Pipeline(self._stage_capture, [
+                ("enhance", self._stage_enhance),
+                ("detect", self._stage_detect),
+                ("annotate", self._stage_annotate),
+                ("present", self._stage_present),
+            ], queue_size=PIPELINE_QUEUE_SIZE, policies=pipeline_policies)
+            self.pipeline.start()
+
+    def _create_detector(self, detector_process, roi_tracking=False, max_hands=1):
+        # Ayrı süreçte çıkarım: MediaPipe, Tk ve grafik çizimiyle GIL için yarışmaz
+        if detector_process:
+            try:
+                return ProcessHandDetector(frame_shape=WORKING_SIZE[::-1] + (3,), roi_tracking=roi_tracking,
+                                           max_hands=max_hands)
+            except Exception as e:
+                print("⚠️ El algılama süreci başlatılamadı, aynı süreçte çalışılacak:", e)
+        return HandDetector(max_hands=max_hands, roi_tracking=roi_tracking)
 
     def adjust_gamma(self, image, gamma_value):
-        inv_gamma = 1.0 / gamma_value
-        table = np.array([(i / 255.0) ** inv_gamma * 255 for i in range(256)]).astype("uint8")
-        return cv2.LUT(image, table)
+        return self.enhancer.adjust_gamma(image, gamma_value)
 
     def auto_gamma_correction(self, image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        mean_intensity = np.mean(gray)
-
-        if mean_intensity < 100:
-            gamma = 1.8
-        elif mean_intensity > 170:
-            gamma = 0.6
-        else:
-            gamma = 1.2
-
-        return self.adjust_gamma(image, gamma)
+        return self.enhancer.adjust_gamma(image, self.enhancer.auto_gamma_value(image))
 
     def auto_contrast(self, image):
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        cl = clahe.apply(l)
-        merged = cv2.merge((cl, a, b))
-        return cv2.cvtColor(merged, cv2.COLOR_LAB2BGR)
-
-    def get_frame(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            return None, None
+        return self.enhancer.equalize(image)
 
-        frame = cv2.resize(frame, (380, 380))
+    @property
+    def enhance_timings(self):
+        """İyileştirme aşamalarının kare başına ortalama süreleri (ms)"""
+        return dict(self.enhancer.timings)
 
-        if self.auto_gamma:
-            frame = self.auto_gamma_correction(frame)
+    def get_frame(self, timeout=1.0):
+        if self.pipeline:
+            packet = self.pipeline.get(timeout)
         else:
-            frame = self.adjust_gamma(frame, self.gamma)
-
-        if self.equalize_hist:
-            frame = self.auto_contrast(frame)
-
-        frame, landmarks = self.hand_detector.process_with_landmarks(frame)
-
+            packet = self._process_serial(timeout)
+        if packet is None:
+            return None, None
+        self.frame_id, self.frame_timestamp = packet.frame_id, packet.timestamp
+        self.hands = packet.hands
+        return packet.output, packet.landmarks
+
+    def pipeline_stats(self):
+        """Aşama başına işlenen kare, ortalama süre ve atılan kare sayıları"""
+        return self.pipeline.stats() if self.pipeline else {}
+
+    def detector_stats(self):
+        """Algılayıcı sayaçları: kırpma isabet oranı, tam kare ve (varsa) seyrek algılama sayıları"""
+        return self.hand_detector.roi_stats()
+
+    def _process_serial(self, timeout):
+        packet = self._stage_capture(timeout)
+        if packet is None:
+            return None
+        for stage in (self._stage_enhance, self._stage_detect, self._stage_annotate, self._stage_present):
+            packet = stage(packet)
+        return packet
+
+    def _stage_capture(self, timeout=0.1):
+        # Yeni kare gelene kadar bekler; kamera okuma hızı işlemeyi engellemez
+        captured = self.camera.read(newer_than=self._captured_id, timeout=timeout)
+        if captured is None:
+            return None
+        self._captured_id = captured.frame_id
+        return FramePacket(captured.frame_id, captured.timestamp, captured.frame)
+
+    def _stage_enhance(self, packet):
+        frame = packet.frame
+        if frame.shape[1::-1] != WORKING_SIZE:
+            frame = cv2.resize(frame, WORKING_SIZE)
+        else:
+            frame = frame.copy()  # Halka tampondaki kare üzerine çizim yapılmasın
+        packet.frame = self.enhancer.process(frame, self.gamma, self.auto_gamma, self.equalize_hist)
+        return packet
+
+    def _stage_detect(self, packet):
+        hands, handedness = order_hands(*self.hand_detector.detect(packet.frame))
+        if self.smooth_landmarks:
+            # Yakalama zamanı kullanılır; atılan kareler filtre adımını bozmaz
+            hands = self.smoother(hands, packet.timestamp)
+        packet.frame, packet.hands = all_hands_landmarks(packet.frame, hands, handedness,
+                                                         packet.frame_id, packet.timestamp)
+        packet.landmarks = packet.hands[0] if packet.hands else None
+        latency = (time.time() - packet.timestamp) * 1000
+        self.latency_ms = 0.9 * self.latency_ms + 0.1 * latency if self.latency_ms else latency
+        return packet
+
+    def _stage_annotate(self, packet):
+        frame, landmarks, hands = packet.frame, packet.landmarks, packet.hands
         if landmarks:
             mod_gesture.set_current_landmarks(landmarks)
+            mod_gesture.set_current_hands(hands)
             mod_gesture.set_current_frame(frame.copy())
 
             if self.draw_triangles:
-                for i1, i2, i3 in self.estimator.finger_points.values():
-                    pts = np.array([landmarks[i1], landmarks[i2], landmarks[i3]], np.int32)
-                    cv2.polylines(frame, [pts], isClosed=True, color=(0, 255, 0), thickness=1)
+                # Tüm ellerin üçgenleri tek seferde: (H * 5, 3, 2) piksel noktaları
+                pts = hands.xy[:, self.estimator.finger_indices].astype(np.int32).reshape(-1, 3, 2)
+                cv2.polylines(frame, list(pts), isClosed=True, color=(0, 255, 0), thickness=1)
 
             if self.show_bbox:
-                x1, y1, x2, y2 = mod_gesture.get_bounding_box(landmarks)
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+                for hand in hands.xy:
+                    x1, y1, x2, y2 = mod_gesture.get_bounding_box(hand)
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+        return packet
 
-        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), landmarks
+    def _stage_present(self, packet):
+        packet.output = cv2.cvtColor(packet.frame, cv2.COLOR_BGR2RGB)
+        return packet
 
     def release(self):
-        self.cap.release()
+        if self.pipeline:
+            self.pipeline.stop()
+        if hasattr(self.hand_detector, "close"):
+            self.hand_detector.close()
+        self.camera.release()